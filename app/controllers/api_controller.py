@@ -2,7 +2,9 @@
 RESTful API controller for prompt management.
 Provides JSON API endpoints following REST conventions.
 """
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, jsonify, request
 from flask_login import login_required
 from app.services import PromptService, TagService, MergeService, CursorService, AttachedPromptService, FavoriteSetService
 from app.controllers.base import BaseController
@@ -117,6 +119,29 @@ def create_prompt():
     }), 201
 
 
+@api_bp.route('/prompts/bulk', methods=['POST'])
+@login_required
+@require_json
+@BaseController.validate_request_data(['prompts'])
+@BaseController.handle_service_error
+def create_prompts():
+    """
+    Create several prompts in one request and one transaction.
+    
+    Required fields:
+    - prompts: List of prompt objects with the fields accepted by POST /prompts
+    """
+    data = request.get_json()
+    
+    # Create prompts
+    prompts = prompt_service.create_prompts(data['prompts'])
+    
+    return jsonify({
+        'message': f'{len(prompts)} prompts created successfully',
+        'prompts': [prompt.to_dict() for prompt in prompts]
+    }), 201
+
+
 @api_bp.route('/prompts/<int:id>', methods=['PUT'])
 @login_required
 @require_json
@@ -426,14 +451,18 @@ def get_statistics():
     }), 200
 
 
+# The health payload never changes, so it is serialized once at import
+HEALTH_RESPONSE_BODY = json.dumps({
+    'status': 'healthy',
+    'service': 'Prompt Manager API',
+    'version': '1.0.0'
+}, separators=(',', ':'), sort_keys=True).encode() + b'\n'
+
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Prompt Manager API',
-        'version': '1.0.0'
-    }), 200
+    return Response(HEALTH_RESPONSE_BODY, status=200, mimetype='application/json')
 
 
 # Favorite Sets endpoints
@@ -9,7 +9,9 @@ from sqlalchemy.orm import relationship
 # Association table for many-to-many relationship
 prompt_tags = db.Table('prompt_tags',
     db.Column('prompt_id', db.Integer, db.ForeignKey('prompts.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    # The primary key leads with prompt_id; tag-side lookups need their own index
+    db.Index('ix_prompt_tags_tag_id', 'tag_id')
 )
 
 
@@ -45,6 +45,15 @@ class BaseRepository(Generic[ModelType]):
             
         return query.all()
     
+    def _list_query(self):
+        """
+        Base query for the paginated listing methods.
+        
+        Subclasses override this to add loader options for the relationships
+        their list views serialize.
+        """
+        return self.model.query
+    
     def get_paginated(self, page: int = 1, per_page: int = 20, **filters) -> Dict[str, Any]:
         """
         Get paginated results.
@@ -57,7 +66,7 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Dictionary with items, total, page, per_page, has_next, has_prev
         """
-        query = self.model.query
+        query = self._list_query()
         
         if filters:
             query = self._apply_filters(query, filters)
@@ -90,7 +99,7 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Dictionary with items, total, page, per_page, has_next, has_prev
         """
-        query = self.model.query
+        query = self._list_query()
 
         # Apply OR clause early to avoid being affected by later filter_by
         or_clause = filters.pop('or__', None)
@@ -242,21 +251,50 @@ class BaseRepository(Generic[ModelType]):
             return True
         return False
     
-    def bulk_create(self, items: List[Dict[str, Any]]) -> List[ModelType]:
+    def bulk_create(self, items: List[Dict[str, Any]], commit: bool = True) -> List[ModelType]:
         """
         Create multiple records in a single transaction.
         
         Args:
             items: List of dictionaries with model attributes
+            commit: Commit the transaction; if False, only flush so the
+                caller can commit it together with other writes
             
         Returns:
             List of created model instances
         """
         instances = [self.model(**item) for item in items]
         self.session.bulk_save_objects(instances, return_defaults=True)
-        self.session.commit()
+        self._finish_write(commit)
+        return instances
+    
+    def create_many(self, items: List[Dict[str, Any]], commit: bool = True) -> List[ModelType]:
+        """
+        Create multiple records with one flush and commit.
+        
+        Unlike bulk_create, the instances are added to the session, so their
+        relationships can still be set after creation.
+        
+        Args:
+            items: List of dictionaries with model attributes
+            commit: Commit the transaction; if False, only flush so the
+                caller can commit it together with other writes
+            
+        Returns:
+            List of created model instances
+        """
+        instances = [self.model(**item) for item in items]
+        self.session.add_all(instances)
+        self._finish_write(commit)
         return instances
     
+    def _finish_write(self, commit: bool):
+        """Commit the session, or just flush it when the caller commits later."""
+        if commit:
+            self.session.commit()
+        else:
+            self.session.flush()
+    
     def exists(self, **filters) -> bool:
         """
         Check if a record exists with given filters.
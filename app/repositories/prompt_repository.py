@@ -3,6 +3,7 @@ Repository for Prompt model with specific query methods.
 """
 from typing import List, Optional, Dict, Any
 from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import selectinload
 from app.models import Prompt, Tag, prompt_tags, AttachedPrompt
 from .base import BaseRepository
 
@@ -14,6 +15,14 @@ class PromptRepository(BaseRepository[Prompt]):
         """Initialize PromptRepository."""
         super().__init__(Prompt)
     
+    def _list_query(self):
+        """Load the tags of a listed page with one IN query instead of re-running the page query."""
+        return self.model.query.options(selectinload(Prompt.tags))
+    
+    def get_by_id(self, id: int) -> Optional[Prompt]:
+        """Get a prompt by ID, loading its tags with one IN query."""
+        return self.model.query.options(selectinload(Prompt.tags)).get(id)
+    
     def get_all_active(self) -> List[Prompt]:
         """Get all active prompts."""
         return self.model.query.filter_by(is_active=True).all()
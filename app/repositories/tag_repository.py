@@ -2,7 +2,7 @@
 Repository for Tag model with specific query methods.
 """
 from typing import List, Optional, Dict, Any
-from sqlalchemy import func
+from sqlalchemy import and_, case, func
 from app.models import Tag, Prompt, prompt_tags
 from .base import BaseRepository
 
@@ -55,29 +55,8 @@ class TagRepository(BaseRepository[Tag]):
         Returns:
             List of dictionaries with tag info and usage count
         """
-        # Base query to get tags with their usage count
-        query = (
-            self.session.query(
-                Tag,
-                func.count(prompt_tags.c.prompt_id).label('usage_count')
-            )
-            .outerjoin(prompt_tags, Tag.id == prompt_tags.c.tag_id)
-        )
-        
-        # Apply status filter if specified
-        if is_active is not None:
-            from app.models import Prompt
-            query = (
-                query
-                .join(Prompt, prompt_tags.c.prompt_id == Prompt.id)
-                .filter(Prompt.is_active == is_active)
-            )
-        
-        # Complete the query with grouping, ordering, and limit
         results = (
-            query
-            .group_by(Tag.id)
-            .order_by(func.count(prompt_tags.c.prompt_id).desc())
+            self._popular_tags_query(is_active)
             .limit(limit)
             .all()
         )
@@ -90,6 +69,71 @@ class TagRepository(BaseRepository[Tag]):
             for tag, count in results
         ]
     
+    def _popular_tags_query(self, is_active: Optional[bool] = None):
+        """Build the tag usage count query behind get_popular_tags."""
+        usage_count = func.count(prompt_tags.c.prompt_id)
+        query = self.session.query(Tag, usage_count.label('usage_count'))
+        
+        if is_active is None:
+            # Keep unused tags with a zero count
+            query = query.outerjoin(prompt_tags, Tag.id == prompt_tags.c.tag_id)
+        else:
+            # Filter prompts in the join itself so each association row is
+            # matched against one prompt by primary key
+            query = (
+                query
+                .join(prompt_tags, Tag.id == prompt_tags.c.tag_id)
+                .join(Prompt, and_(
+                    prompt_tags.c.prompt_id == Prompt.id,
+                    Prompt.is_active == is_active
+                ))
+            )
+        
+        return query.group_by(Tag.id).order_by(usage_count.desc())
+    
+    def get_popular_tags_by_status(self, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get popular tags for all, active and inactive prompts in one query.
+        
+        Args:
+            limit: Maximum number of tags per status
+        
+        Returns:
+            Dictionary with 'all', 'active' and 'inactive' lists shaped like
+            get_popular_tags results
+        """
+        results = (
+            self.session.query(
+                Tag,
+                func.count(prompt_tags.c.prompt_id).label('usage_count'),
+                func.sum(case((Prompt.is_active.is_(True), 1), else_=0)).label('active_count'),
+                func.sum(case((Prompt.is_active.is_(False), 1), else_=0)).label('inactive_count')
+            )
+            .outerjoin(prompt_tags, Tag.id == prompt_tags.c.tag_id)
+            .outerjoin(Prompt, prompt_tags.c.prompt_id == Prompt.id)
+            .group_by(Tag.id)
+            .all()
+        )
+        
+        def top(column: int, skip_unused: bool) -> List[Dict[str, Any]]:
+            rows = [row for row in results if row[column] or not skip_unused]
+            rows.sort(key=lambda row: row[column], reverse=True)
+            return [
+                {
+                    'tag': row[0],
+                    'usage_count': row[column]
+                }
+                for row in rows[:limit]
+            ]
+        
+        # Status buckets only hold tags used by prompts of that status,
+        # as get_popular_tags does when filtering
+        return {
+            'all': top(1, skip_unused=False),
+            'active': top(2, skip_unused=True),
+            'inactive': top(3, skip_unused=True)
+        }
+    
     def get_unused_tags(self) -> List[Tag]:
         """
         Get tags that are not associated with any prompts.
@@ -173,13 +217,15 @@ class TagRepository(BaseRepository[Tag]):
             'min_prompts_per_tag': min(usage_counts) if usage_counts else 0
         }
     
-    def bulk_get_or_create(self, tag_names: List[str], default_color: str = '#3B82F6') -> List[Tag]:
+    def bulk_get_or_create(self, tag_names: List[str], default_color: str = '#3B82F6',
+                           commit: bool = True) -> List[Tag]:
         """
         Get or create multiple tags efficiently.
         
         Args:
             tag_names: List of tag names
             default_color: Default color for new tags
+            commit: Commit new tags; if False, only flush them
             
         Returns:
             List of Tag instances
@@ -201,7 +247,7 @@ class TagRepository(BaseRepository[Tag]):
                 new_tags.append({'name': name, 'color': default_color})
         
         if new_tags:
-            created_tags = self.bulk_create(new_tags)
+            created_tags = self.create_many(new_tags, commit=commit)
             existing_tags.extend(created_tags)
         
         return existing_tags
@@ -2,7 +2,7 @@
 Service layer for Prompt business logic.
 Implements business rules and orchestrates data access through repositories.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from app.repositories import PromptRepository, TagRepository, AttachedPromptRepository
 from app.models import Prompt, Tag
@@ -47,36 +47,10 @@ class PromptService:
             ValueError: If validation fails
         """
         try:
-            # Extract and validate required fields
-            title = data.get('title', '').strip()
-            content = data.get('content', '').strip()
-            
-            if not title:
-                raise ValueError("Title is required")
-            if not content:
-                raise ValueError("Content is required")
-            if len(title) > 255:
-                raise ValueError("Title must be less than 255 characters")
-            
-            # Extract optional fields
-            description = data.get('description', '').strip()
-            is_active = data.get('is_active', True)
-            is_public = data.get('is_public', False)
-            tag_names = data.get('tags', [])
-            
-            # Handle checkbox value for is_active
-            if isinstance(is_active, str):
-                is_active = is_active.lower() in ('true', '1', 'on', 'yes')
+            fields, tag_names = self._prepare_prompt_fields(data)
             
             # Create prompt
-            prompt = self.prompt_repo.create(
-                title=title,
-                content=content,
-                description=description,
-                is_active=is_active,
-                is_public=is_public,
-                user_id=(current_user.id if getattr(current_user, 'is_authenticated', False) else None)
-            )
+            prompt = self.prompt_repo.create(**fields)
             
             # Process tags if provided
             if tag_names:
@@ -91,6 +65,105 @@ class PromptService:
             logger.error(f"Error in create_prompt: {str(e)}", exc_info=True)
             raise
     
+    def create_prompts(self, items: List[Dict[str, Any]]) -> List[Prompt]:
+        """
+        Create several prompts in a single transaction.
+        
+        Every item is validated before anything is written, so one invalid
+        item rejects the whole batch.
+        
+        Args:
+            items: List of dictionaries accepted by create_prompt
+            
+        Returns:
+            List of created Prompt instances, in input order
+            
+        Raises:
+            ValueError: If validation fails for any item
+        """
+        if not isinstance(items, list) or not items:
+            raise ValueError("Prompts must be a non-empty list")
+        if not all(isinstance(data, dict) for data in items):
+            raise ValueError("Each prompt must be an object")
+        
+        prepared = [self._prepare_prompt_fields(data) for data in items]
+        
+        try:
+            # Resolve the tags of the whole batch with one lookup
+            valid_tag_names = {
+                Tag.normalize_name(name)
+                for _, tag_names in prepared
+                for name in tag_names
+                if validate_tag_name(name)
+            }
+            tags_by_name = {
+                tag.name: tag
+                for tag in self.tag_repo.bulk_get_or_create(list(valid_tag_names), commit=False)
+            }
+            
+            # Build each prompt with its tags, so the flush writes every association
+            # row in one executemany instead of loading each new prompt's tags first
+            rows = []
+            for fields, tag_names in prepared:
+                tags = {}
+                for name in tag_names:
+                    tag = tags_by_name.get(Tag.normalize_name(name))
+                    if tag is not None:
+                        tags[tag.name] = tag
+                rows.append({**fields, 'tags': list(tags.values())})
+            
+            prompts = self.prompt_repo.create_many(rows, commit=False)
+            self.prompt_repo.commit()
+        except Exception:
+            self.prompt_repo.rollback()
+            raise
+        
+        return prompts
+    
+    def _prepare_prompt_fields(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Validate prompt data and build the model fields for a new prompt.
+        
+        Args:
+            data: Prompt data as accepted by create_prompt
+            
+        Returns:
+            Tuple of (model field dict, list of tag names)
+            
+        Raises:
+            ValueError: If validation fails
+        """
+        # Extract and validate required fields
+        title = data.get('title', '').strip()
+        content = data.get('content', '').strip()
+        
+        if not title:
+            raise ValueError("Title is required")
+        if not content:
+            raise ValueError("Content is required")
+        if len(title) > 255:
+            raise ValueError("Title must be less than 255 characters")
+        
+        # Extract optional fields
+        description = data.get('description', '').strip()
+        is_active = data.get('is_active', True)
+        is_public = data.get('is_public', False)
+        tag_names = data.get('tags', [])
+        
+        # Handle checkbox value for is_active
+        if isinstance(is_active, str):
+            is_active = is_active.lower() in ('true', '1', 'on', 'yes')
+        
+        fields = {
+            'title': title,
+            'content': content,
+            'description': description,
+            'is_active': is_active,
+            'is_public': is_public,
+            'user_id': (current_user.id if getattr(current_user, 'is_authenticated', False) else None)
+        }
+        return fields, tag_names
+    
     def update_prompt(self, id: int, data: Dict[str, Any]) -> Prompt:
         """
         Update an existing prompt with validation.
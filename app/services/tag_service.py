@@ -193,6 +193,18 @@ class TagService:
         """
         return self.tag_repo.get_popular_tags(limit, is_active)
     
+    def get_popular_tags_by_status(self, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get most popular tags for every prompt status at once.
+        
+        Args:
+            limit: Maximum number of tags per status
+            
+        Returns:
+            Dictionary with 'all', 'active' and 'inactive' tag lists
+        """
+        return self.tag_repo.get_popular_tags_by_status(limit)
+    
     def get_tag_cloud(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         Get tags for tag cloud visualization.
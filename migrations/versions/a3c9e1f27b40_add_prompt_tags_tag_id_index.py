@@ -0,0 +1,25 @@
+"""Add index on prompt_tags.tag_id
+
+Revision ID: a3c9e1f27b40
+Revises: d6108f958397
+Create Date: 2026-10-16 14:40:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e1f27b40'
+down_revision = 'd6108f958397'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The composite primary key leads with prompt_id, so tag-side joins
+    # (popular tags, prompts by tag) scanned the whole table
+    op.create_index('ix_prompt_tags_tag_id', 'prompt_tags', ['tag_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prompt_tags_tag_id', table_name='prompt_tags')
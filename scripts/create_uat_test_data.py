@@ -21,12 +21,109 @@ from datetime import datetime
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import exists, func, insert, select
+
 from app import create_app
 from app.models.tag import Tag
-from app.models.prompt import Prompt
+from app.models.prompt import Prompt, prompt_tags
 from app.models.base import db
 
 
+# Tag name and color for every tag created by the script
+TAG_SPECS = (
+    ("python", "#3776ab"),
+    ("javascript", "#f7df1e"),
+    ("sql", "#e48e00"),
+    ("html", "#e34f26"),
+    ("css", "#1572b6"),
+    ("react", "#61dafb"),
+    ("vue", "#4fc08d"),
+    ("angular", "#dd0031"),
+    ("nodejs", "#339933"),
+    ("docker", "#2496ed"),
+    ("kubernetes", "#326ce5"),
+    ("aws", "#ff9900"),
+    ("azure", "#0089d6"),
+    ("gcp", "#4285f4"),
+    ("git", "#f05032"),
+    ("linux", "#fcc624"),
+    ("windows", "#0078d4"),
+    ("macos", "#000000"),
+    ("api", "#ff6b6b"),
+    ("database", "#4ecdc4"),
+)
+
+# Prompt title, content and active status
+PROMPT_SPECS = (
+    # Active prompts
+    ("Python Web Development", "Complete guide to Python web development", True),
+    ("JavaScript ES6+ Features", "Modern JavaScript features and syntax", True),
+    ("React Hooks Tutorial", "Understanding React hooks and state management", True),
+    ("Vue.js 3 Composition API", "Vue 3 composition API guide", True),
+    ("Angular Services", "Angular dependency injection and services", True),
+    ("Node.js REST API", "Building REST APIs with Node.js and Express", True),
+    ("Docker Containerization", "Containerizing applications with Docker", True),
+    ("Kubernetes Deployment", "Deploying applications to Kubernetes", True),
+    ("AWS Lambda Functions", "Serverless functions with AWS Lambda", True),
+    ("Azure DevOps Pipeline", "CI/CD with Azure DevOps", True),
+    ("Google Cloud Functions", "Serverless functions with GCP", True),
+    ("Git Workflow Best Practices", "Git branching and collaboration strategies", True),
+    ("Linux System Administration", "Linux server management and administration", True),
+    ("API Design Principles", "RESTful API design and best practices", True),
+    ("Database Optimization", "SQL query optimization and indexing", True),
+    
+    # Inactive prompts
+    ("Legacy JavaScript ES5", "Old JavaScript syntax and patterns", False),
+    ("AngularJS 1.x Guide", "Legacy AngularJS framework", False),
+    ("Windows Server 2012", "Legacy Windows server administration", False),
+    ("Old Docker Compose", "Legacy Docker Compose syntax", False),
+    ("Deprecated AWS Services", "AWS services that are no longer recommended", False),
+    ("Legacy Git Commands", "Old Git commands and workflows", False),
+    ("Traditional API Patterns", "SOAP and XML-based APIs", False),
+    ("Legacy Database Systems", "Old database systems and practices", False),
+    ("Windows 7 Development", "Development for Windows 7 platform", False),
+    ("Old React Patterns", "Legacy React class components", False),
+)
+
+# Prompt title and the names of the tags attached to it
+SCENARIOS = (
+    # Scenario 1: Tags used in both active and inactive prompts
+    ("Python Web Development", ("python", "javascript")),
+    ("Legacy JavaScript ES5", ("javascript",)),
+    ("JavaScript ES6+ Features", ("javascript", "html")),
+    ("AngularJS 1.x Guide", ("html",)),
+    ("React Hooks Tutorial", ("react", "javascript")),
+    
+    # Scenario 2: Tags used only in active prompts
+    ("Vue.js 3 Composition API", ("vue",)),
+    ("Angular Services", ("angular",)),
+    ("Node.js REST API", ("nodejs",)),
+    ("Docker Containerization", ("docker",)),
+    ("Kubernetes Deployment", ("kubernetes",)),
+    
+    # Scenario 3: Tags used only in inactive prompts
+    ("Windows Server 2012", ("windows",)),
+    ("Old Docker Compose", ("docker",)),
+    ("Deprecated AWS Services", ("aws",)),
+    ("Legacy Git Commands", ("linux",)),
+    ("Traditional API Patterns", ("api",)),
+    ("Legacy Database Systems", ("database",)),
+    
+    # Scenario 4: Multiple tags per prompt
+    ("AWS Lambda Functions", ("aws", "nodejs")),
+    ("Azure DevOps Pipeline", ("azure", "docker")),
+    ("Google Cloud Functions", ("gcp", "nodejs")),
+    ("Git Workflow Best Practices", ("git", "linux")),
+    ("Linux System Administration", ("linux", "python")),
+    ("API Design Principles", ("api", "nodejs")),
+    ("Database Optimization", ("database", "sql")),
+    
+    # Scenario 5: Complex inactive scenarios
+    ("Windows 7 Development", ("windows", "api")),
+    ("Old React Patterns", ("react", "javascript")),
+)
+
+
 def create_uat_test_data():
     """Create comprehensive test data for UAT."""
     app = create_app('development')
@@ -40,65 +137,19 @@ def create_uat_test_data():
         # db.session.commit()
         
         # Create tags with different colors
-        tags = [
-            Tag(name="python", color="#3776ab"),
-            Tag(name="javascript", color="#f7df1e"),
-            Tag(name="sql", color="#e48e00"),
-            Tag(name="html", color="#e34f26"),
-            Tag(name="css", color="#1572b6"),
-            Tag(name="react", color="#61dafb"),
-            Tag(name="vue", color="#4fc08d"),
-            Tag(name="angular", color="#dd0031"),
-            Tag(name="nodejs", color="#339933"),
-            Tag(name="docker", color="#2496ed"),
-            Tag(name="kubernetes", color="#326ce5"),
-            Tag(name="aws", color="#ff9900"),
-            Tag(name="azure", color="#0089d6"),
-            Tag(name="gcp", color="#4285f4"),
-            Tag(name="git", color="#f05032"),
-            Tag(name="linux", color="#fcc624"),
-            Tag(name="windows", color="#0078d4"),
-            Tag(name="macos", color="#000000"),
-            Tag(name="api", color="#ff6b6b"),
-            Tag(name="database", color="#4ecdc4")
-        ]
-        
-        print(f"📝 Creating {len(tags)} tags...")
-        for tag in tags:
-            db.session.add(tag)
+        print(f"📝 Creating {len(TAG_SPECS)} tags...")
+        tags = db.session.scalars(
+            insert(Tag).returning(Tag, sort_by_parameter_order=True),
+            [{"name": name, "color": color} for name, color in TAG_SPECS]
+        ).all()
+        tags_by_name = {tag.name: tag.id for tag in tags}
         db.session.commit()
         print("✅ Tags created successfully!")
         
         # Create prompts with different statuses
         prompts = [
-            # Active prompts
-            Prompt(title="Python Web Development", content="Complete guide to Python web development", is_active=True),
-            Prompt(title="JavaScript ES6+ Features", content="Modern JavaScript features and syntax", is_active=True),
-            Prompt(title="React Hooks Tutorial", content="Understanding React hooks and state management", is_active=True),
-            Prompt(title="Vue.js 3 Composition API", content="Vue 3 composition API guide", is_active=True),
-            Prompt(title="Angular Services", content="Angular dependency injection and services", is_active=True),
-            Prompt(title="Node.js REST API", content="Building REST APIs with Node.js and Express", is_active=True),
-            Prompt(title="Docker Containerization", content="Containerizing applications with Docker", is_active=True),
-            Prompt(title="Kubernetes Deployment", content="Deploying applications to Kubernetes", is_active=True),
-            Prompt(title="AWS Lambda Functions", content="Serverless functions with AWS Lambda", is_active=True),
-            Prompt(title="Azure DevOps Pipeline", content="CI/CD with Azure DevOps", is_active=True),
-            Prompt(title="Google Cloud Functions", content="Serverless functions with GCP", is_active=True),
-            Prompt(title="Git Workflow Best Practices", content="Git branching and collaboration strategies", is_active=True),
-            Prompt(title="Linux System Administration", content="Linux server management and administration", is_active=True),
-            Prompt(title="API Design Principles", content="RESTful API design and best practices", is_active=True),
-            Prompt(title="Database Optimization", content="SQL query optimization and indexing", is_active=True),
-            
-            # Inactive prompts
-            Prompt(title="Legacy JavaScript ES5", content="Old JavaScript syntax and patterns", is_active=False),
-            Prompt(title="AngularJS 1.x Guide", content="Legacy AngularJS framework", is_active=False),
-            Prompt(title="Windows Server 2012", content="Legacy Windows server administration", is_active=False),
-            Prompt(title="Old Docker Compose", content="Legacy Docker Compose syntax", is_active=False),
-            Prompt(title="Deprecated AWS Services", content="AWS services that are no longer recommended", is_active=False),
-            Prompt(title="Legacy Git Commands", content="Old Git commands and workflows", is_active=False),
-            Prompt(title="Traditional API Patterns", content="SOAP and XML-based APIs", is_active=False),
-            Prompt(title="Legacy Database Systems", content="Old database systems and practices", is_active=False),
-            Prompt(title="Windows 7 Development", content="Development for Windows 7 platform", is_active=False),
-            Prompt(title="Old React Patterns", content="Legacy React class components", is_active=False)
+            Prompt(title=title, content=content, is_active=is_active)
+            for title, content, is_active in PROMPT_SPECS
         ]
         
         print(f"📝 Creating {len(prompts)} prompts...")
@@ -109,82 +160,66 @@ def create_uat_test_data():
         
         # Associate tags with prompts to create various scenarios
         print("🔗 Associating tags with prompts...")
-        
-        # Scenario 1: Tags used in both active and inactive prompts
-        prompts[0].tags = [tags[0], tags[1]]  # python, javascript (active)
-        prompts[15].tags = [tags[1]]          # javascript (inactive)
-        
-        prompts[1].tags = [tags[1], tags[3]]  # javascript, html (active)
-        prompts[16].tags = [tags[3]]          # html (inactive)
-        
-        prompts[2].tags = [tags[5], tags[1]]  # react, javascript (active)
-        prompts[24].tags = [tags[5]]          # react (inactive)
-        
-        # Scenario 2: Tags used only in active prompts
-        prompts[3].tags = [tags[6]]           # vue (active only)
-        prompts[4].tags = [tags[7]]           # angular (active only)
-        prompts[5].tags = [tags[8]]           # nodejs (active only)
-        prompts[6].tags = [tags[9]]           # docker (active only)
-        prompts[7].tags = [tags[10]]          # kubernetes (active only)
-        
-        # Scenario 3: Tags used only in inactive prompts
-        prompts[17].tags = [tags[16]]         # windows (inactive only)
-        prompts[18].tags = [tags[9]]          # docker (inactive only)
-        prompts[19].tags = [tags[11]]         # aws (inactive only)
-        prompts[20].tags = [tags[15]]         # git (inactive only)
-        prompts[21].tags = [tags[18]]         # api (inactive only)
-        prompts[22].tags = [tags[19]]         # database (inactive only)
-        
-        # Scenario 4: Multiple tags per prompt
-        prompts[8].tags = [tags[11], tags[8]]     # aws, nodejs (active)
-        prompts[9].tags = [tags[12], tags[9]]     # azure, docker (active)
-        prompts[10].tags = [tags[13], tags[8]]    # gcp, nodejs (active)
-        prompts[11].tags = [tags[14], tags[15]]   # git, linux (active)
-        prompts[12].tags = [tags[15], tags[0]]    # linux, python (active)
-        prompts[13].tags = [tags[18], tags[8]]    # api, nodejs (active)
-        prompts[14].tags = [tags[19], tags[2]]    # database, sql (active)
-        
-        # Scenario 5: Complex inactive scenarios
-        prompts[23].tags = [tags[16], tags[18]]   # windows, api (inactive)
-        prompts[24].tags = [tags[5], tags[1]]     # react, javascript (inactive)
-        
+        prompts_by_title = {prompt.title: prompt.id for prompt in prompts}
+        assoc_rows = [
+            {"prompt_id": prompts_by_title[title], "tag_id": tags_by_name[tag_name]}
+            for title, tag_names in SCENARIOS
+            for tag_name in tag_names
+        ]
+        db.session.execute(insert(prompt_tags), assoc_rows)
         db.session.commit()
         print("✅ Tag associations created successfully!")
         
         # Print summary
-        print("\n📊 Test Data Summary:")
-        print(f"   • Tags created: {len(tags)}")
-        print(f"   • Prompts created: {len(prompts)}")
-        print(f"   • Active prompts: {len([p for p in prompts if p.is_active])}")
-        print(f"   • Inactive prompts: {len([p for p in prompts if not p.is_active])}")
+        active_count = sum(1 for p in prompts if p.is_active)
+        inactive_count = len(prompts) - active_count
         
-        # Print tag usage scenarios
-        print("\n🎯 Tag Usage Scenarios:")
-        
-        # Tags used in both active and inactive
+        # Tag usage scenarios
         both_tags = ["javascript", "html", "react"]
-        print(f"   • Tags used in both active and inactive: {', '.join(both_tags)}")
-        
-        # Tags used only in active
         active_only = ["vue", "angular", "nodejs", "docker", "kubernetes"]
-        print(f"   • Tags used only in active: {', '.join(active_only)}")
-        
-        # Tags used only in inactive
         inactive_only = ["windows", "aws", "git", "api", "database"]
-        print(f"   • Tags used only in inactive: {', '.join(inactive_only)}")
         
-        print("\n✅ UAT test data creation completed!")
-        print("\n🚀 Ready for User Acceptance Testing!")
-        print("   Navigate to http://localhost:5001/prompts to test the feature.")
+        summary = [
+            "\n📊 Test Data Summary:",
+            f"   • Tags created: {len(tags)}",
+            f"   • Prompts created: {len(prompts)}",
+            f"   • Active prompts: {active_count}",
+            f"   • Inactive prompts: {inactive_count}",
+            "\n🎯 Tag Usage Scenarios:",
+            f"   • Tags used in both active and inactive: {', '.join(both_tags)}",
+            f"   • Tags used only in active: {', '.join(active_only)}",
+            f"   • Tags used only in inactive: {', '.join(inactive_only)}",
+            "\n✅ UAT test data creation completed!",
+            "\n🚀 Ready for User Acceptance Testing!",
+            "   Navigate to http://localhost:5001/prompts to test the feature.",
+        ]
+        print("\n".join(summary))
         
         return {
             'tags': tags,
             'prompts': prompts,
-            'active_count': len([p for p in prompts if p.is_active]),
-            'inactive_count': len([p for p in prompts if not p.is_active])
+            'active_count': active_count,
+            'inactive_count': inactive_count
         }
 
 
+def _count_tag_prompts_by_status(tag, batch_size=1000):
+    """Count active and inactive prompts of a tag, streaming rows in batches."""
+    stmt = (
+        select(Prompt.is_active)
+        .join(prompt_tags, prompt_tags.c.prompt_id == Prompt.id)
+        .where(prompt_tags.c.tag_id == tag.id)
+        .execution_options(yield_per=batch_size)
+    )
+    active = inactive = 0
+    for is_active in db.session.execute(stmt).scalars():
+        if is_active:
+            active += 1
+        else:
+            inactive += 1
+    return active, inactive
+
+
 def verify_test_data():
     """Verify that test data was created correctly."""
     app = create_app('development')
@@ -204,20 +239,22 @@ def verify_test_data():
         print(f"   • Inactive prompts: {inactive_prompts}")
         
         # Check tag associations
-        tags_with_prompts = db.session.query(Tag).join(Tag.prompts).distinct().count()
+        tags_with_prompts = db.session.execute(
+            select(func.count())
+            .select_from(Tag)
+            .where(exists().where(prompt_tags.c.tag_id == Tag.id))
+        ).scalar()
         print(f"   • Tags with associated prompts: {tags_with_prompts}")
         
         # Verify specific scenarios
         javascript_tag = Tag.query.filter_by(name="javascript").first()
         if javascript_tag:
-            active_js_prompts = sum(1 for p in javascript_tag.prompts if p.is_active)
-            inactive_js_prompts = sum(1 for p in javascript_tag.prompts if not p.is_active)
+            active_js_prompts, inactive_js_prompts = _count_tag_prompts_by_status(javascript_tag)
             print(f"   • JavaScript tag - Active prompts: {active_js_prompts}, Inactive: {inactive_js_prompts}")
         
         vue_tag = Tag.query.filter_by(name="vue").first()
         if vue_tag:
-            active_vue_prompts = sum(1 for p in vue_tag.prompts if p.is_active)
-            inactive_vue_prompts = sum(1 for p in vue_tag.prompts if not p.is_active)
+            active_vue_prompts, inactive_vue_prompts = _count_tag_prompts_by_status(vue_tag)
             print(f"   • Vue tag - Active prompts: {active_vue_prompts}, Inactive: {inactive_vue_prompts}")
         
         print("✅ Test data verification completed!")
@@ -4,9 +4,33 @@ Health check script for monitoring Prompt Manager application.
 Can be used with monitoring systems like Nagios, Zabbix, or cron jobs.
 """
 import sys
+import socket
 import requests
 import argparse
 from datetime import datetime
+from urllib.parse import urlparse
+
+
+def is_port_open(url, timeout=0.5):
+    """Check that the application port accepts TCP connections.
+    
+    Args:
+        url: Base URL of the application
+        timeout: Connection timeout in seconds
+        
+    Returns:
+        bool: True if the port is open
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname or 'localhost'
+    port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    
+    # create_connection resolves the host to IPv4 or IPv6 addresses as needed
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
 
 
 def check_health(url, timeout=5):
@@ -21,6 +45,10 @@ def check_health(url, timeout=5):
     """
     health_url = f"{url.rstrip('/')}/api/health"
     
+    # Fail fast on a closed port instead of waiting for the HTTP timeout
+    if not is_port_open(url):
+        return False, "Port closed", None
+    
     try:
         response = requests.get(health_url, timeout=timeout)
         
@@ -8,6 +8,8 @@ from pathlib import Path
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy import inspect
+
 from app.models import db
 from config.development import DevelopmentConfig
 
@@ -26,6 +28,13 @@ def init_database():
     db.init_app(app)
     
     with app.app_context():
+        # Skip create_all when every mapped table already exists
+        existing_tables = set(inspect(db.engine).get_table_names())
+        missing_tables = set(db.metadata.tables) - existing_tables
+        if not missing_tables:
+            print("Database tables already exist, nothing to create.")
+            return
+        
         # Create all tables (for initial dev setup). For ongoing changes, prefer Alembic migrations.
         print("Creating database tables...")
         db.create_all()
@@ -6,11 +6,12 @@ import sys
 import subprocess
 
 
-def run_command(command):
-    """Run a command and return exit code."""
-    print(f"\nRunning: {command}")
+def run_command(module, *args):
+    """Run a Python module with the current interpreter and return exit code."""
+    command = [sys.executable, "-m", module, *args]
+    print(f"\nRunning: {' '.join(command[2:])}")
     print("-" * 60)
-    return subprocess.call(command, shell=True)
+    return subprocess.run(command, check=False).returncode
 
 
 def main():
@@ -33,33 +34,35 @@ def main():
     
     if test_type == "unit":
         print("Running unit tests...")
-        exit_code = run_command("pytest tests/unit -v")
+        exit_code = run_command("pytest", "tests/unit", "-v")
     
     elif test_type == "integration":
         print("Running integration tests...")
-        exit_code = run_command("pytest tests/integration -v")
+        exit_code = run_command("pytest", "tests/integration", "-v")
     
     elif test_type == "coverage":
         print("Running tests with coverage...")
-        exit_code = run_command("pytest --cov=app --cov-report=html --cov-report=term")
+        exit_code = run_command(
+            "pytest", "--cov=app", "--cov-report=html", "--cov-report=term"
+        )
         if exit_code == 0:
             print("\nCoverage report generated in htmlcov/index.html")
     
     elif test_type == "lint":
         print("Running linters...")
         commands = [
-            "flake8 app tests --max-line-length=100 --ignore=E501,W503",
-            "black --check app tests",
-            "mypy app --ignore-missing-imports"
+            ("flake8", "app", "tests", "--max-line-length=100", "--ignore=E501,W503"),
+            ("black", "--check", "app", "tests"),
+            ("mypy", "app", "--ignore-missing-imports")
         ]
         for cmd in commands:
-            code = run_command(cmd)
+            code = run_command(*cmd)
             if code != 0:
                 exit_code = code
     
     elif test_type == "all":
         print("Running all tests...")
-        exit_code = run_command("pytest -v")
+        exit_code = run_command("pytest", "-v")
     
     else:
         print(f"Unknown test type: {test_type}")
@@ -8,7 +8,9 @@ from pathlib import Path
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.models import db, Prompt, Tag
+from sqlalchemy import func, insert, select
+
+from app.models import db, Prompt, Tag, prompt_tags
 from config.development import DevelopmentConfig
 
 
@@ -93,26 +95,33 @@ def seed_database():
                     tags_dict[tag_name] = tag
         
         # Create prompts
+        # Statements are built once so every row reuses the same cached compiled form
         print("Creating prompts...")
+        prompt_insert = insert(Prompt).returning(Prompt.id)
+        prompt_tags_insert = insert(prompt_tags)
         for prompt_data in SAMPLE_PROMPTS:
-            prompt = Prompt(
-                title=prompt_data['title'],
-                content=prompt_data['content'],
-                description=prompt_data['description']
-            )
+            prompt_id = db.session.execute(prompt_insert, {
+                'title': prompt_data['title'],
+                'content': prompt_data['content'],
+                'description': prompt_data['description']
+            }).scalar_one()
             
             # Add tags
-            for tag_name in prompt_data['tags']:
-                prompt.tags.append(tags_dict[tag_name])
-            
-            prompt.save()
-            print(f"  Created: {prompt.title}")
+            db.session.execute(prompt_tags_insert, [
+                {'prompt_id': prompt_id, 'tag_id': tags_dict[tag_name].id}
+                for tag_name in prompt_data['tags']
+            ])
+            print(f"  Created: {prompt_data['title']}")
+        db.session.commit()
         
         # Show statistics
         print(f"\nDatabase seeded successfully!")
         print(f"  - Total prompts: {Prompt.query.count()}")
         print(f"  - Total tags: {Tag.query.count()}")
-        print(f"  - Active prompts: {len(Prompt.get_active())}")
+        active_count = db.session.execute(
+            select(func.count()).select_from(Prompt).where(Prompt.is_active.is_(True))
+        ).scalar()
+        print(f"  - Active prompts: {active_count}")
 
 
 if __name__ == "__main__":
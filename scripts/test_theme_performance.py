@@ -4,9 +4,16 @@ Theme System Performance Testing Script
 Tests the performance impact of the theme system on page load times
 """
 
+import contextlib
+import functools
+from bisect import bisect_right
+import re
 import time
 import requests
-import statistics
+import urllib3
+from requests.adapters import HTTPAdapter
+import math
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 import json
 import sys
@@ -15,61 +22,147 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import event
+
 from app import create_app
-from app.config import TestingConfig
+from app.models import db
+
+
+# Markers expected in the rendered main page when the theme system is wired up
+THEME_COMPONENTS = (
+    b'theme-bg', b'theme-text', b'theme-toggle', b'theme-service.js',
+    b'style.css', b'aria-label', b'skip-link'
+)
+THEME_COMPONENTS_PATTERN = re.compile(b'|'.join(map(re.escape, THEME_COMPONENTS)))
+
+# Up to this many markers, per-marker bytes.find beats a regex alternation
+FIND_SCAN_MAX_PATTERNS = 10
+
+# Encodings advertised for static assets; br is left out since decoding it needs brotli
+ASSET_ACCEPT_ENCODING = 'gzip, deflate'
+
+# Average load time bounds (seconds) and the verdict for each band they delimit
+PERFORMANCE_THRESHOLDS = (0.5, 1.0)
+PERFORMANCE_VERDICTS = (
+    ('✅', 'Excellent performance'),
+    ('⚠️ ', 'Acceptable performance, consider optimization'),
+    ('❌', 'Poor performance, requires optimization'),
+)
+
+
+def find_theme_components(html):
+    """Return the set of THEME_COMPONENTS present in a raw HTML body"""
+    if len(THEME_COMPONENTS) <= FIND_SCAN_MAX_PATTERNS:
+        # bytes.find uses CPython's C-level fast search, no regex engine overhead
+        return {c for c in THEME_COMPONENTS if html.find(c) != -1}
+    return set(THEME_COMPONENTS_PATTERN.findall(html))
+
+
+class RunningStats:
+    """Single-pass load time statistics using Welford's online algorithm"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value):
+        """Fold one sample into the running aggregates"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    @property
+    def stdev(self):
+        """Sample standard deviation (0 for fewer than two samples)"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0
 
 
 class ThemePerformanceTester:
     """Performance tester for theme system"""
     
-    def __init__(self, base_url='http://localhost:5000'):
+    def __init__(self, base_url='http://localhost:5000', inter_request_delay=0.0, http2=False,
+                 client='requests'):
         self.base_url = base_url
+        self.inter_request_delay = inter_request_delay
+        self.client = 'httpx' if http2 else client
         self.results = {}
         
-    def test_page_load_time(self, endpoint, iterations=10):
-        """Test page load time for a specific endpoint"""
-        times = []
+        # Per-endpoint results log, open while run_comprehensive_test runs
+        self.log_fp = None
         
-        print(f"Testing {endpoint}...")
+        if self.client == 'httpx':
+            # HTTP/2 multiplexes concurrent probes over one connection (negotiated over TLS)
+            import httpx
+            self.session = httpx.Client(http2=True, timeout=10.0)
+            self.request_errors = (httpx.HTTPError,)
+        elif self.client == 'urllib3':
+            # Same keep-alive pool requests wraps, without its per-call session machinery
+            self.session = urllib3.PoolManager(num_pools=4, maxsize=16, retries=False)
+            self.request_errors = (urllib3.exceptions.HTTPError,)
+        else:
+            # Keep-alive session so iterations reuse pooled connections
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+            self.request_errors = (requests.RequestException,)
         
-        for i in range(iterations):
+    def _get(self, url):
+        """Issue a GET with the configured client, returning (status_code, body)"""
+        if self.client == 'urllib3':
+            response = self.session.request('GET', url, preload_content=False)
             try:
-                start_time = time.time()
-                response = requests.get(urljoin(self.base_url, endpoint))
-                load_time = time.time() - start_time
-                
-                if response.status_code == 200:
-                    times.append(load_time)
-                    print(f"  Iteration {i+1}: {load_time:.3f}s")
-                else:
-                    print(f"  Iteration {i+1}: Failed (Status {response.status_code})")
-                    
-            except requests.RequestException as e:
-                print(f"  Iteration {i+1}: Error - {e}")
-                
-            # Small delay between requests
-            time.sleep(0.1)
-        
-        if times:
-            avg_time = statistics.mean(times)
-            min_time = min(times)
-            max_time = max(times)
-            std_dev = statistics.stdev(times) if len(times) > 1 else 0
-            
-            self.results[endpoint] = {
-                'iterations': len(times),
-                'avg_time': avg_time,
-                'min_time': min_time,
-                'max_time': max_time,
-                'std_dev': std_dev,
-                'times': times
-            }
-            
-            print(f"  Results: Avg={avg_time:.3f}s, Min={min_time:.3f}s, Max={max_time:.3f}s, StdDev={std_dev:.3f}s")
-        else:
+                return response.status, response.read()
+            finally:
+                response.release_conn()
+        response = self.session.get(url)
+        return response.status_code, response.content
+    
+    def _warm_up(self, url):
+        """Issue one untimed request so connection setup and cold caches stay out of the stats"""
+        print("  Warm-up request (not measured)")
+        try:
+            self._get(url)
+        except self.request_errors as e:
+            print(f"  Warm-up: Error - {e}")
+    
+    def _probe(self, endpoint, url):
+        """Time a single GET request, returning (endpoint, load_time, status_code)"""
+        try:
+            start_time = time.perf_counter()
+            status_code, _ = self._get(url)
+            load_time = time.perf_counter() - start_time
+            return endpoint, load_time, status_code
+        except self.request_errors as e:
+            print(f"  {endpoint}: Error - {e}")
+            return endpoint, None, None
+    
+    def _record_stats(self, endpoint, stats):
+        """Store aggregated load times for an endpoint in self.results"""
+        if not stats.count:
             print(f"  No successful measurements for {endpoint}")
-            
-        return times
+            return None
+        
+        result = {
+            'iterations': stats.count,
+            'avg_time': stats.mean,
+            'min_time': stats.min,
+            'max_time': stats.max,
+            'std_dev': stats.stdev
+        }
+        self.results[endpoint] = result
+        if self.log_fp is not None:
+            self.log_fp.write(json.dumps({'endpoint': endpoint, **result}) + '\n')
+            self.log_fp.flush()
+        
+        print(f"  Results: Avg={stats.mean:.3f}s, Min={stats.min:.3f}s, Max={stats.max:.3f}s, StdDev={stats.stdev:.3f}s")
+        return result
     
     def test_theme_switch_performance(self, iterations=5):
         """Test theme switching performance using JavaScript simulation"""
@@ -77,54 +170,114 @@ class ThemePerformanceTester:
         
         # This would require browser automation for full testing
         # For now, we simulate by testing the theme service script load time
-        times = []
+        stats = RunningStats()
+        log = []
+        url = urljoin(self.base_url, '/')
+        self._warm_up(url)
         
         for i in range(iterations):
             try:
-                start_time = time.time()
-                response = requests.get(urljoin(self.base_url, '/'))
-                load_time = time.time() - start_time
+                start_time = time.perf_counter()
+                status_code, body = self._get(url)
+                load_time = time.perf_counter() - start_time
                 
-                if response.status_code == 200:
+                if status_code == 200:
                     # Check if theme service script is present
-                    if 'theme-service.js' in response.text:
-                        times.append(load_time)
-                        print(f"  Iteration {i+1}: {load_time:.3f}s (theme service loaded)")
+                    if b'theme-service.js' in body:
+                        stats.add(load_time)
+                        log.append(f"  Iteration {i+1}: {load_time:.3f}s (theme service loaded)")
                     else:
-                        print(f"  Iteration {i+1}: {load_time:.3f}s (theme service not found)")
+                        log.append(f"  Iteration {i+1}: {load_time:.3f}s (theme service not found)")
                         
-            except requests.RequestException as e:
-                print(f"  Iteration {i+1}: Error - {e}")
+            except self.request_errors as e:
+                log.append(f"  Iteration {i+1}: Error - {e}")
                 
-            time.sleep(0.1)
+            if self.inter_request_delay:
+                time.sleep(self.inter_request_delay)
         
-        if times:
-            avg_time = statistics.mean(times)
-            print(f"  Theme service load time: Avg={avg_time:.3f}s")
+        if log:
+            print('\n'.join(log))
+        if stats.count:
+            print(f"  Theme service load time: Avg={stats.mean:.3f}s")
             
-        return times
+        return stats
+    
+    def _stream_asset(self, url, chunk_size=65536):
+        """Download an asset chunk by chunk without buffering the body.
+        
+        Returns (status_code, headers, decoded_size, wire_size); wire_size is the
+        number of bytes actually transferred, which is smaller when the server compresses.
+        """
+        headers = {'Accept-Encoding': ASSET_ACCEPT_ENCODING}
+        return self._ASSET_STREAMERS[self.client](self, url, headers, chunk_size)
+    
+    def _stream_asset_httpx(self, url, headers, chunk_size):
+        """_stream_asset for the httpx client"""
+        size = 0
+        with self.session.stream('GET', url, headers=headers) as response:
+            if response.status_code == 200:
+                for chunk in response.iter_bytes(chunk_size):
+                    size += len(chunk)
+        return response.status_code, response.headers, size, response.num_bytes_downloaded
+    
+    def _stream_asset_urllib3(self, url, headers, chunk_size):
+        """_stream_asset for the urllib3 client"""
+        size = 0
+        response = self.session.request('GET', url, headers=headers, preload_content=False)
+        try:
+            if response.status == 200:
+                for chunk in response.stream(chunk_size):
+                    size += len(chunk)
+            return response.status, response.headers, size, response.tell()
+        finally:
+            response.release_conn()
+    
+    def _stream_asset_requests(self, url, headers, chunk_size):
+        """_stream_asset for the requests client"""
+        size = 0
+        response = self.session.get(url, stream=True, headers=headers)
+        try:
+            if response.status_code == 200:
+                for chunk in response.iter_content(chunk_size):
+                    size += len(chunk)
+            wire_size = response.raw.tell()
+        finally:
+            response.close()
+        return response.status_code, response.headers, size, wire_size
+    
+    _ASSET_STREAMERS = {
+        'httpx': _stream_asset_httpx,
+        'urllib3': _stream_asset_urllib3,
+        'requests': _stream_asset_requests,
+    }
+    
+    def _report_asset(self, label, headers, file_size, wire_size, load_time):
+        """Print size, compression and transfer rate for a downloaded asset"""
+        print(f"  {label} file size: {file_size:,} bytes")
+        print(f"  Content-Encoding: {headers.get('Content-Encoding', 'none')}")
+        print(f"  Transferred: {wire_size:,} bytes")
+        print(f"  Load time: {load_time:.3f}s")
+        print(f"  Transfer rate: {wire_size / load_time / 1024:.1f} KB/s")
     
     def test_css_load_performance(self):
         """Test CSS file load performance"""
         print("Testing CSS load performance...")
         
+        url = urljoin(self.base_url, '/static/css/style.css')
         try:
-            start_time = time.time()
-            response = requests.get(urljoin(self.base_url, '/static/css/style.css'))
-            load_time = time.time() - start_time
+            start_time = time.perf_counter()
+            status_code, headers, file_size, wire_size = self._stream_asset(url)
+            load_time = time.perf_counter() - start_time
             
-            if response.status_code == 200:
-                file_size = len(response.content)
-                print(f"  CSS file size: {file_size:,} bytes")
-                print(f"  Load time: {load_time:.3f}s")
-                print(f"  Transfer rate: {file_size / load_time / 1024:.1f} KB/s")
+            if status_code == 200:
+                self._report_asset('CSS', headers, file_size, wire_size, load_time)
                 
                 return load_time, file_size
             else:
-                print(f"  Failed to load CSS (Status {response.status_code})")
+                print(f"  Failed to load CSS (Status {status_code})")
                 return None, None
                 
-        except requests.RequestException as e:
+        except self.request_errors as e:
             print(f"  Error loading CSS: {e}")
             return None, None
     
@@ -132,40 +285,65 @@ class ThemePerformanceTester:
         """Test JavaScript file load performance"""
         print("Testing JavaScript load performance...")
         
+        url = urljoin(self.base_url, '/static/js/theme-service.js')
         try:
-            start_time = time.time()
-            response = requests.get(urljoin(self.base_url, '/static/js/theme-service.js'))
-            load_time = time.time() - start_time
+            start_time = time.perf_counter()
+            status_code, headers, file_size, wire_size = self._stream_asset(url)
+            load_time = time.perf_counter() - start_time
             
-            if response.status_code == 200:
-                file_size = len(response.content)
-                print(f"  JS file size: {file_size:,} bytes")
-                print(f"  Load time: {load_time:.3f}s")
-                print(f"  Transfer rate: {file_size / load_time / 1024:.1f} KB/s")
+            if status_code == 200:
+                self._report_asset('JS', headers, file_size, wire_size, load_time)
                 
                 return load_time, file_size
             else:
-                print(f"  Failed to load JS (Status {response.status_code})")
+                print(f"  Failed to load JS (Status {status_code})")
                 return None, None
                 
-        except requests.RequestException as e:
+        except self.request_errors as e:
             print(f"  Error loading JS: {e}")
             return None, None
     
-    def run_comprehensive_test(self):
+    def run_comprehensive_test(self, iterations=5, concurrency=1):
         """Run comprehensive performance test suite"""
+        # Per-endpoint results are appended as they complete so a crashed run keeps its data
+        try:
+            with open('theme_performance_results.jsonl', 'w') as self.log_fp:
+                self._run_test_suite(iterations, concurrency)
+        finally:
+            self.log_fp = None
+    
+    def _run_test_suite(self, iterations, concurrency):
+        """Run every test of run_comprehensive_test and print the report"""
         print("=== Theme System Performance Test Suite ===")
         print()
         
-        # Test main pages
+        # Test main pages; requests are I/O bound, so pages can be probed concurrently
         pages = ['/', '/prompts', '/prompts/create', '/prompts/tags']
         
+        urls = {page: urljoin(self.base_url, page) for page in pages}
+        
+        print("Warming up pages...")
         for page in pages:
-            self.test_page_load_time(page, iterations=5)
+            self._warm_up(urls[page])
+        print()
+        
+        stats_by_page = {page: RunningStats() for page in pages}
+        tasks = [page for page in pages for _ in range(iterations)]
+        task_urls = [urls[page] for page in tasks]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for endpoint, load_time, status_code in executor.map(self._probe, tasks, task_urls):
+                if status_code == 200:
+                    stats_by_page[endpoint].add(load_time)
+                elif status_code is not None:
+                    print(f"  {endpoint}: Failed (Status {status_code})")
+        
+        for page in pages:
+            print(f"Testing {page}...")
+            self._record_stats(page, stats_by_page[page])
             print()
         
         # Test theme switching
-        self.test_theme_switch_performance()
+        self.test_theme_switch_performance(iterations=iterations)
         print()
         
         # Test static assets
@@ -175,6 +353,11 @@ class ThemePerformanceTester:
         self.test_js_load_performance()
         print()
         
+        if self.client == 'urllib3':
+            self.session.clear()
+        else:
+            self.session.close()
+        
         # Generate report
         self.generate_report()
     
@@ -202,88 +385,121 @@ class ThemePerformanceTester:
         # Recommendations
         print("Recommendations:")
         for endpoint, data in self.results.items():
-            if data['avg_time'] < 0.5:
-                print(f"  ✅ {endpoint}: Excellent performance")
-            elif data['avg_time'] < 1.0:
-                print(f"  ⚠️  {endpoint}: Acceptable performance, consider optimization")
-            else:
-                print(f"  ❌ {endpoint}: Poor performance, requires optimization")
+            icon, verdict = PERFORMANCE_VERDICTS[bisect_right(PERFORMANCE_THRESHOLDS, data['avg_time'])]
+            print(f"  {icon} {endpoint}: {verdict}")
         
         print()
         
-        # Save results to file
-        with open('theme_performance_results.json', 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # Save results to file (orjson when available, it serializes in C)
+        try:
+            import orjson
+        except ImportError:
+            with open('theme_performance_results.json', 'w') as f:
+                json.dump(self.results, f, indent=2)
+        else:
+            with open('theme_performance_results.json', 'wb') as f:
+                f.write(orjson.dumps(self.results, option=orjson.OPT_INDENT_2))
         
         print("Results saved to theme_performance_results.json")
+        print("Per-endpoint results streamed to theme_performance_results.jsonl")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_app():
+    """Build the testing app once per process; every local tester shares it"""
+    return create_app('testing')
 
 
 class LocalThemeTester:
     """Local testing using Flask test client"""
     
     def __init__(self):
-        self.app = create_app(TestingConfig)
+        self.app = _get_app()
         self.client = self.app.test_client()
         
+        # Count new DB connections to confirm the pooled connection is reused across calls
+        self.db_connects = 0
+    
+    def _on_db_connect(self, dbapi_connection, connection_record):
+        """Engine 'connect' listener counting freshly opened DB connections"""
+        self.db_connects += 1
+    
+    @contextlib.contextmanager
+    def _counting_db_connects(self):
+        """Listen for new DB connections only while the block runs.
+        
+        The app and its engine are shared by every tester, so the listener
+        is removed again instead of piling up one per instance.
+        """
+        engine = db.engine
+        event.listen(engine, 'connect', self._on_db_connect)
+        try:
+            yield
+        finally:
+            event.remove(engine, 'connect', self._on_db_connect)
+        
     def test_local_performance(self):
         """Test performance using local Flask test client"""
         print("=== Local Theme System Performance Test ===")
         print()
         
-        # Test main page load
-        start_time = time.time()
-        response = self.client.get('/')
-        load_time = time.time() - start_time
+        # One app context for all calls, so requests skip their own push/pop
+        with self.client as client, self.app.app_context(), self._counting_db_connects():
+            # Test main page load
+            start_time = time.perf_counter()
+            response = client.get('/')
+            load_time = time.perf_counter() - start_time
         
-        print(f"Main page load time: {load_time:.3f}s")
+            print(f"Main page load time: {load_time:.3f}s")
         
-        if response.status_code == 200:
-            html = response.data.decode('utf-8')
+            if response.status_code == 200:
+                # Substring checks run on the raw body, no need to decode it
+                html = response.data
             
-            # Check for theme components
-            theme_components = [
-                'theme-bg', 'theme-text', 'theme-toggle', 'theme-service.js',
-                'style.css', 'aria-label', 'skip-link'
-            ]
+                # Check for theme components
+                found = find_theme_components(html)
             
-            print("\nTheme Components Check:")
-            for component in theme_components:
-                if component in html:
-                    print(f"  ✅ {component}: Present")
-                else:
-                    print(f"  ❌ {component}: Missing")
+                print("\nTheme Components Check:")
+                for component in THEME_COMPONENTS:
+                    name = component.decode()
+                    if component in found:
+                        print(f"  ✅ {name}: Present")
+                    else:
+                        print(f"  ❌ {name}: Missing")
             
-            # Check file sizes
-            print("\nStatic Asset Sizes:")
+                # Check file sizes
+                print("\nStatic Asset Sizes:")
             
-            # CSS file
-            css_response = self.client.get('/static/css/style.css')
-            if css_response.status_code == 200:
-                css_size = len(css_response.data)
-                print(f"  CSS: {css_size:,} bytes")
+                # CSS file
+                css_response = client.get('/static/css/style.css')
+                if css_response.status_code == 200:
+                    css_size = len(css_response.data)
+                    print(f"  CSS: {css_size:,} bytes")
             
-            # JS file
-            js_response = self.client.get('/static/js/theme-service.js')
-            if js_response.status_code == 200:
-                js_size = len(js_response.data)
-                print(f"  JS: {js_size:,} bytes")
+                # JS file
+                js_response = client.get('/static/js/theme-service.js')
+                if js_response.status_code == 200:
+                    js_size = len(js_response.data)
+                    print(f"  JS: {js_size:,} bytes")
             
-            total_size = css_size + js_size
-            print(f"  Total theme assets: {total_size:,} bytes")
+                total_size = css_size + js_size
+                print(f"  Total theme assets: {total_size:,} bytes")
             
-            # Performance assessment
-            print(f"\nPerformance Assessment:")
-            if load_time < 0.1:
-                print(f"  ✅ Excellent: {load_time:.3f}s")
-            elif load_time < 0.5:
-                print(f"  ✅ Good: {load_time:.3f}s")
-            elif load_time < 1.0:
-                print(f"  ⚠️  Acceptable: {load_time:.3f}s")
-            else:
-                print(f"  ❌ Poor: {load_time:.3f}s")
+                # Performance assessment
+                print(f"\nPerformance Assessment:")
+                if load_time < 0.1:
+                    print(f"  ✅ Excellent: {load_time:.3f}s")
+                elif load_time < 0.5:
+                    print(f"  ✅ Good: {load_time:.3f}s")
+                elif load_time < 1.0:
+                    print(f"  ⚠️  Acceptable: {load_time:.3f}s")
+                else:
+                    print(f"  ❌ Poor: {load_time:.3f}s")
                 
-        else:
-            print(f"Failed to load main page (Status {response.status_code})")
+            else:
+                print(f"Failed to load main page (Status {response.status_code})")
+        
+        print(f"\nDB connections opened: {self.db_connects}")
 
 
 def main():
@@ -295,6 +511,18 @@ def main():
                        help='Test mode: local (Flask test client) or remote (HTTP requests)')
     parser.add_argument('--url', default='http://localhost:5000',
                        help='Base URL for remote testing')
+    parser.add_argument('--delay', type=float, default=0.0,
+                       help='Delay in seconds between remote requests (default: 0)')
+    # --http2 picks the httpx client, so it cannot be combined with --client
+    client_group = parser.add_mutually_exclusive_group()
+    client_group.add_argument('--http2', action='store_true',
+                              help='Use an HTTP/2 httpx client for remote testing (requires httpx[http2])')
+    client_group.add_argument('--client', choices=['requests', 'urllib3'], default='requests',
+                              help='HTTP client for remote testing (default: requests)')
+    parser.add_argument('--iterations', type=int, default=5,
+                       help='Timed requests per page for remote testing (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                       help='Concurrent page probes for remote testing (default: 1)')
     
     args = parser.parse_args()
     
@@ -302,8 +530,10 @@ def main():
         tester = LocalThemeTester()
         tester.test_local_performance()
     else:
-        tester = ThemePerformanceTester(args.url)
-        tester.run_comprehensive_test()
+        tester = ThemePerformanceTester(
+            args.url, inter_request_delay=args.delay, http2=args.http2, client=args.client
+        )
+        tester.run_comprehensive_test(iterations=args.iterations, concurrency=args.concurrency)
 
 
 if __name__ == '__main__':
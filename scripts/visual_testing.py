@@ -5,6 +5,8 @@ Tests visual consistency, accessibility, and performance across themes
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 import os
@@ -12,13 +14,91 @@ import sys
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 import subprocess
+import threading
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Sidecar file remembering static asset ETags and sizes between runs
+ASSET_CACHE_FILE = ".visual_test_asset_cache.json"
+
+
+def _linearize_channel(c: int) -> float:
+    """sRGB gamma expansion of an 8-bit channel value (WCAG relative luminance)"""
+    c = c / 255.0
+    return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+
+
+# Report icon for each test status
+_STATUS_ICON = {"passed": "✅", "failed": "❌", "warning": "⚠️"}
+
+# Linearized value for every possible 8-bit channel, so luminance needs no pow() calls
+_GAMMA_LUT = tuple(_linearize_channel(c) for c in range(256))
+
+# Foreground/background pairs checked against WCAG contrast ratios
+_COLOR_TESTS = (
+    {
+        "name": "Primary text on background",
+        "foreground": "#111827",  # Light theme primary text
+        "background": "#F9FAFB",  # Light theme background
+        "expected_ratio": 4.5
+    },
+    {
+        "name": "Primary text on background (dark)",
+        "foreground": "#F8FAFC",  # Dark theme primary text
+        "background": "#0F172A",  # Dark theme background
+        "expected_ratio": 4.5
+    },
+    {
+        "name": "Secondary text on background",
+        "foreground": "#6B7280",  # Light theme secondary text
+        "background": "#F9FAFB",  # Light theme background
+        "expected_ratio": 3.0
+    },
+    {
+        "name": "Secondary text on background (dark)",
+        "foreground": "#E2E8F0",  # Dark theme secondary text
+        "background": "#0F172A",  # Dark theme background
+        "expected_ratio": 3.0
+    }
+)
+
+# Viewport sizes covered by the responsive design check
+_VIEWPORTS = (
+    {"name": "Mobile", "width": 375, "height": 667},
+    {"name": "Tablet", "width": 768, "height": 1024},
+    {"name": "Desktop", "width": 1920, "height": 1080}
+)
+
+# Browser user agents covered by the compatibility check
+_USER_AGENTS = (
+    {"name": "Chrome", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"},
+    {"name": "Firefox", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0"},
+    {"name": "Safari", "ua": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"},
+    {"name": "Edge", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59"}
+)
+
+
+def _make_session() -> requests.Session:
+    """Build a keep-alive session with the tester's default headers and retry budget"""
+    session = requests.Session()
+    session.headers.update({
+        "Accept": "text/html",
+        "User-Agent": "VisualThemeTester/1.0"
+    })
+    # Short retry budget so a briefly unavailable server does not fail the report
+    retry = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 class VisualThemeTester:
     """Comprehensive visual testing for theme system"""
     
-    def __init__(self, base_url: str = "http://localhost:5000"):
+    def __init__(self, base_url: str = "http://localhost:5000",
+                 session: Optional[requests.Session] = None):
         self.base_url = base_url
         self.results = {
             "timestamp": datetime.now().isoformat(),
@@ -31,6 +111,70 @@ class VisualThemeTester:
             }
         }
         
+        # One keep-alive session shared by every probe, possibly already warmed up by the caller
+        self.session = session if session is not None else _make_session()
+        # Bounded timeout so a stalled server cannot hang the report
+        self.timeout = 2.0
+        
+        # ETag and size of previously downloaded static assets, keyed by URL
+        self.asset_cache = self._load_asset_cache()
+        
+        # Root page fetched once per run and shared by every test that reads it
+        self._root_lock = threading.Lock()
+        self._root_status: Optional[int] = None
+        self._root_html: Optional[bytes] = None
+        self._root_load_time: Optional[float] = None
+    
+    def _get_root(self) -> Tuple[int, bytes, float]:
+        """Return (status_code, raw html, load_time) of the root page, fetching it on first use"""
+        with self._root_lock:
+            if self._root_html is None:
+                start_time = time.time()
+                response = self.session.get(f"{self.base_url}/", timeout=self.timeout)
+                self._root_load_time = time.time() - start_time
+                self._root_status = response.status_code
+                # Kept as bytes: the checks only look for ASCII markers, so no decode is needed
+                self._root_html = response.content
+            return self._root_status, self._root_html, self._root_load_time
+    
+    def _load_asset_cache(self) -> Dict:
+        """Load the asset validator cache left by a previous run"""
+        try:
+            with open(ASSET_CACHE_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_asset_cache(self):
+        """Persist the asset validator cache for the next run"""
+        try:
+            with open(ASSET_CACHE_FILE, 'w') as f:
+                json.dump(self.asset_cache, f)
+        except OSError as e:
+            print(f"⚠️ Could not save asset cache: {str(e)}")
+    
+    def _get_asset_size(self, url: str) -> int:
+        """Return an asset's size in bytes, preferring HEAD's Content-Length over a download"""
+        head_response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+        content_length = head_response.headers.get("Content-Length")
+        if head_response.status_code == 200 and content_length is not None:
+            return int(content_length)
+        
+        # No length advertised (e.g. chunked): revalidate a cached copy with If-None-Match
+        cached = self.asset_cache.get(url)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached:
+                return cached["size"]
+            
+            # Count the body in chunks instead of holding it in memory
+            size = sum(len(chunk) for chunk in response.iter_content(8192))
+        
+        etag = response.headers.get("ETag")
+        if response.status_code == 200 and etag:
+            self.asset_cache[url] = {"etag": etag, "size": size}
+        return size
+        
     def test_theme_switching_visual_consistency(self) -> Dict:
         """Test visual consistency during theme switching"""
         print("🔍 Testing theme switching visual consistency...")
@@ -44,43 +188,39 @@ class VisualThemeTester:
         
         try:
             # Test light theme
-            light_response = requests.get(f"{self.base_url}/", headers={
-                "Accept": "text/html",
-                "User-Agent": "VisualThemeTester/1.0"
-            })
+            light_status, html, _ = self._get_root()
             
-            if light_response.status_code == 200:
+            if light_status == 200:
                 test_results["details"].append("✅ Light theme loads successfully")
             else:
                 test_results["status"] = "failed"
-                test_results["details"].append(f"❌ Light theme failed to load: {light_response.status_code}")
+                test_results["details"].append(f"❌ Light theme failed to load: {light_status}")
             
-            # Test dark theme (simulate via JavaScript)
-            dark_response = requests.get(f"{self.base_url}/", headers={
-                "Accept": "text/html",
-                "User-Agent": "VisualThemeTester/1.0"
-            })
+            # Test dark theme (simulate via JavaScript); the server renders the same page
+            dark_status, _, _ = self._get_root()
             
-            if dark_response.status_code == 200:
+            if dark_status == 200:
                 test_results["details"].append("✅ Dark theme loads successfully")
             else:
                 test_results["status"] = "failed"
-                test_results["details"].append(f"❌ Dark theme failed to load: {dark_response.status_code}")
+                test_results["details"].append(f"❌ Dark theme failed to load: {dark_status}")
             
             # Check for theme toggle button presence
-            if 'data-theme-toggle' in light_response.text:
+            if b'data-theme-toggle' in html:
                 test_results["details"].append("✅ Theme toggle button present")
             else:
                 test_results["status"] = "failed"
                 test_results["details"].append("❌ Theme toggle button missing")
             
             # Check for CSS variables
-            if '--primary-color' in light_response.text or '--background-color' in light_response.text:
+            if b'--primary-color' in html or b'--background-color' in html:
                 test_results["details"].append("✅ CSS variables present")
             else:
-                test_results["warnings"].append("⚠️ CSS variables not detected in HTML")
+                test_results["details"].append("⚠️ CSS variables not detected in HTML")
+                if test_results["status"] == "passed":
+                    test_results["status"] = "warning"
             
-        except Exception as e:
+        except requests.RequestException as e:
             test_results["status"] = "failed"
             test_results["details"].append(f"❌ Error during testing: {str(e)}")
         
@@ -97,36 +237,10 @@ class VisualThemeTester:
             "contrast_ratios": {}
         }
         
-        # Define test color combinations
-        color_tests = [
-            {
-                "name": "Primary text on background",
-                "foreground": "#111827",  # Light theme primary text
-                "background": "#F9FAFB",  # Light theme background
-                "expected_ratio": 4.5
-            },
-            {
-                "name": "Primary text on background (dark)",
-                "foreground": "#F8FAFC",  # Dark theme primary text
-                "background": "#0F172A",  # Dark theme background
-                "expected_ratio": 4.5
-            },
-            {
-                "name": "Secondary text on background",
-                "foreground": "#6B7280",  # Light theme secondary text
-                "background": "#F9FAFB",  # Light theme background
-                "expected_ratio": 3.0
-            },
-            {
-                "name": "Secondary text on background (dark)",
-                "foreground": "#E2E8F0",  # Dark theme secondary text
-                "background": "#0F172A",  # Dark theme background
-                "expected_ratio": 3.0
-            }
-        ]
-        
-        for test in color_tests:
-            ratio = self._calculate_contrast_ratio(test["foreground"], test["background"])
+        ratios = self._calculate_contrast_ratios(
+            [(test["foreground"], test["background"]) for test in _COLOR_TESTS]
+        )
+        for test, ratio in zip(_COLOR_TESTS, ratios):
             test_results["contrast_ratios"][test["name"]] = {
                 "ratio": ratio,
                 "expected": test["expected_ratio"],
@@ -141,18 +255,32 @@ class VisualThemeTester:
         
         return test_results
     
+    def _calculate_contrast_ratios(self, color_pairs: List[Tuple[str, str]]) -> List[float]:
+        """Calculate contrast ratios for many color pairs, vectorized with NumPy when installed"""
+        try:
+            import numpy as np
+        except ImportError:
+            return [self._calculate_contrast_ratio(color1, color2) for color1, color2 in color_pairs]
+        
+        # (pairs, 2 colors, 3 channels) array of 8-bit channel values
+        values = np.array([[int(color.lstrip('#'), 16) for color in pair] for pair in color_pairs])
+        channels = (values[..., np.newaxis] >> np.array([16, 8, 0])) & 0xFF
+        
+        # Same gamma table and weights as the scalar path, so both give identical ratios
+        luminance = np.array(_GAMMA_LUT)[channels] @ np.array([0.2126, 0.7152, 0.0722])
+        lighter = luminance.max(axis=1)
+        darker = luminance.min(axis=1)
+        
+        return ((lighter + 0.05) / (darker + 0.05)).tolist()
+    
     def _calculate_contrast_ratio(self, color1: str, color2: str) -> float:
         """Calculate contrast ratio between two colors"""
         def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+            value = int(hex_color.lstrip('#'), 16)
+            return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
         
         def get_luminance(r: int, g: int, b: int) -> float:
-            def adjust_gamma(c: int) -> float:
-                c = c / 255.0
-                return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
-            
-            return 0.2126 * adjust_gamma(r) + 0.7152 * adjust_gamma(g) + 0.0722 * adjust_gamma(b)
+            return 0.2126 * _GAMMA_LUT[r] + 0.7152 * _GAMMA_LUT[g] + 0.0722 * _GAMMA_LUT[b]
         
         rgb1 = hex_to_rgb(color1)
         rgb2 = hex_to_rgb(color2)
@@ -176,20 +304,15 @@ class VisualThemeTester:
             "breakpoints": {}
         }
         
-        # Test different viewport sizes
-        viewports = [
-            {"name": "Mobile", "width": 375, "height": 667},
-            {"name": "Tablet", "width": 768, "height": 1024},
-            {"name": "Desktop", "width": 1920, "height": 1080}
-        ]
-        
         try:
-            for viewport in viewports:
-                response = requests.get(f"{self.base_url}/", headers={
-                    "Accept": "text/html",
-                    "User-Agent": "VisualThemeTester/1.0"
-                })
-                
+            url = f"{self.base_url}/"
+            with ThreadPoolExecutor(max_workers=len(_VIEWPORTS)) as executor:
+                responses = list(executor.map(
+                    lambda viewport: self.session.head(url, allow_redirects=True, timeout=self.timeout),
+                    _VIEWPORTS
+                ))
+            
+            for viewport, response in zip(_VIEWPORTS, responses):
                 if response.status_code == 200:
                     test_results["breakpoints"][viewport["name"]] = {
                         "status": "passed",
@@ -225,9 +348,7 @@ class VisualThemeTester:
         
         try:
             # Test page load time
-            start_time = time.time()
-            response = requests.get(f"{self.base_url}/")
-            load_time = time.time() - start_time
+            _, _, load_time = self._get_root()
             
             test_results["metrics"]["page_load_time"] = load_time
             
@@ -241,8 +362,7 @@ class VisualThemeTester:
                 test_results["status"] = "failed"
             
             # Test CSS file size
-            css_response = requests.get(f"{self.base_url}/static/css/style.css")
-            css_size = len(css_response.content) / 1024  # KB
+            css_size = self._get_asset_size(f"{self.base_url}/static/css/style.css") / 1024  # KB
             
             test_results["metrics"]["css_size_kb"] = css_size
             
@@ -256,8 +376,7 @@ class VisualThemeTester:
                 test_results["status"] = "failed"
             
             # Test JavaScript file size
-            js_response = requests.get(f"{self.base_url}/static/js/theme-service.js")
-            js_size = len(js_response.content) / 1024  # KB
+            js_size = self._get_asset_size(f"{self.base_url}/static/js/theme-service.js") / 1024  # KB
             
             test_results["metrics"]["js_size_kb"] = js_size
             
@@ -274,6 +393,8 @@ class VisualThemeTester:
             test_results["status"] = "failed"
             test_results["details"].append(f"❌ Error during performance testing: {str(e)}")
         
+        self._save_asset_cache()
+        
         return test_results
     
     def test_cross_browser_compatibility(self) -> Dict:
@@ -287,21 +408,17 @@ class VisualThemeTester:
             "browsers": {}
         }
         
-        # Test with different user agents
-        user_agents = [
-            {"name": "Chrome", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"},
-            {"name": "Firefox", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0"},
-            {"name": "Safari", "ua": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"},
-            {"name": "Edge", "ua": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 Edg/91.0.864.59"}
-        ]
-        
         try:
-            for browser in user_agents:
-                response = requests.get(f"{self.base_url}/", headers={
-                    "Accept": "text/html",
-                    "User-Agent": browser["ua"]
-                })
-                
+            url = f"{self.base_url}/"
+            with ThreadPoolExecutor(max_workers=len(_USER_AGENTS)) as executor:
+                responses = list(executor.map(
+                    lambda browser: self.session.head(url, headers={
+                        "User-Agent": browser["ua"]
+                    }, allow_redirects=True, timeout=self.timeout),
+                    _USER_AGENTS
+                ))
+            
+            for browser, response in zip(_USER_AGENTS, responses):
                 if response.status_code == 200:
                     test_results["browsers"][browser["name"]] = "passed"
                     test_results["details"].append(f"✅ {browser['name']} compatibility: OK")
@@ -320,14 +437,19 @@ class VisualThemeTester:
         """Generate comprehensive test report"""
         print("📊 Generating test report...")
         
-        # Run all tests
-        tests = [
-            self.test_theme_switching_visual_consistency(),
-            self.test_accessibility_contrast(),
-            self.test_responsive_design(),
-            self.test_performance_metrics(),
-            self.test_cross_browser_compatibility()
+        # Run all tests concurrently. They share the root page cache, which
+        # _get_root guards with _root_lock, and the keep-alive session. requests
+        # does not document Session as thread-safe; the tests only send GET and
+        # HEAD requests through it and never change its headers or adapters
+        test_methods = [
+            self.test_theme_switching_visual_consistency,
+            self.test_accessibility_contrast,
+            self.test_responsive_design,
+            self.test_performance_metrics,
+            self.test_cross_browser_compatibility
         ]
+        with ThreadPoolExecutor(max_workers=len(test_methods)) as executor:
+            tests = list(executor.map(lambda test_method: test_method(), test_methods))
         
         # Update results
         for test in tests:
@@ -341,64 +463,74 @@ class VisualThemeTester:
             elif test["status"] == "warning":
                 self.results["summary"]["warnings"] += 1
         
+        self.session.close()
+        
         # Generate report
         report = self._format_report()
         
-        # Save report
+        # Save report (orjson when available, it serializes in C)
         report_file = f"visual_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        try:
+            import orjson
+        except ImportError:
+            # Same layout as the orjson output below
+            with open(report_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.results, indent=2, ensure_ascii=False))
+        else:
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(self.results, option=orjson.OPT_INDENT_2))
         
         print(f"📄 Test report saved to: {report_file}")
         return report
     
     def _format_report(self) -> str:
         """Format test results as readable report"""
-        report = []
-        report.append("=" * 80)
-        report.append("VISUAL THEME SYSTEM TEST REPORT")
-        report.append("=" * 80)
-        report.append(f"Generated: {self.results['timestamp']}")
-        report.append("")
+        return "\n".join(self._iter_report())
+    
+    def _iter_report(self):
+        """Yield the lines of the readable report"""
+        yield "=" * 80
+        yield "VISUAL THEME SYSTEM TEST REPORT"
+        yield "=" * 80
+        yield f"Generated: {self.results['timestamp']}"
+        yield ""
         
         # Summary
         summary = self.results["summary"]
-        report.append("SUMMARY:")
-        report.append(f"  Total Tests: {summary['total_tests']}")
-        report.append(f"  Passed: {summary['passed']}")
-        report.append(f"  Failed: {summary['failed']}")
-        report.append(f"  Warnings: {summary['warnings']}")
-        report.append("")
+        yield "SUMMARY:"
+        yield f"  Total Tests: {summary['total_tests']}"
+        yield f"  Passed: {summary['passed']}"
+        yield f"  Failed: {summary['failed']}"
+        yield f"  Warnings: {summary['warnings']}"
+        yield ""
         
         # Test details
-        report.append("DETAILED RESULTS:")
-        report.append("-" * 80)
+        yield "DETAILED RESULTS:"
+        yield "-" * 80
         
         for test_name, test_result in self.results["tests"].items():
-            status_icon = "✅" if test_result["status"] == "passed" else "❌" if test_result["status"] == "failed" else "⚠️"
-            report.append(f"{status_icon} {test_name}: {test_result['status'].upper()}")
+            status_icon = _STATUS_ICON.get(test_result["status"], "❓")
+            yield f"{status_icon} {test_name}: {test_result['status'].upper()}"
             
             for detail in test_result["details"]:
-                report.append(f"    {detail}")
+                yield f"    {detail}"
             
             # Add specific metrics if available
             if "metrics" in test_result:
-                report.append("    Metrics:")
+                yield "    Metrics:"
                 for metric, value in test_result["metrics"].items():
                     if isinstance(value, float):
-                        report.append(f"      {metric}: {value:.2f}")
+                        yield f"      {metric}: {value:.2f}"
                     else:
-                        report.append(f"      {metric}: {value}")
+                        yield f"      {metric}: {value}"
             
             if "contrast_ratios" in test_result:
-                report.append("    Contrast Ratios:")
+                yield "    Contrast Ratios:"
                 for name, ratio_data in test_result["contrast_ratios"].items():
                     status = "✅" if ratio_data["passes"] else "❌"
-                    report.append(f"      {status} {name}: {ratio_data['ratio']:.2f}:1")
+                    yield f"      {status} {name}: {ratio_data['ratio']:.2f}:1"
             
-            report.append("")
-        
-        return "\n".join(report)
+            yield ""
     
     def run_interactive_testing(self):
         """Run interactive testing with browser automation"""
@@ -412,15 +544,16 @@ class VisualThemeTester:
         print("")
         
         try:
-            # Open main page
-            webbrowser.open(f"{self.base_url}/")
-            print(f"✅ Opened {self.base_url}/ in browser")
+            # Resolve the browser once and hand it every page, reusing its window
+            browser = webbrowser.get()
             
-            # Open other important pages
-            pages = ["/prompts", "/prompts/create", "/tags"]
+            # Open main page, then other important pages
+            pages = ["/", "/prompts", "/prompts/create", "/tags"]
             for page in pages:
-                webbrowser.open(f"{self.base_url}{page}")
+                browser.open(f"{self.base_url}{page}", new=0, autoraise=False)
                 print(f"✅ Opened {self.base_url}{page} in browser")
+                # Brief pause so the browser does not collapse back-to-back opens
+                time.sleep(0.05)
                 
         except Exception as e:
             print(f"❌ Error opening browser: {str(e)}")
@@ -431,9 +564,10 @@ def main():
     print("🎨 Visual Theme System Testing")
     print("=" * 50)
     
-    # Check if server is running
+    # Check if server is running; the tester reuses this session and its connection
+    session = _make_session()
     try:
-        response = requests.get("http://localhost:5000/", timeout=5)
+        response = session.head("http://localhost:5000/", allow_redirects=True, timeout=5)
         if response.status_code != 200:
             print("❌ Server is not responding properly")
             print("Please start the Flask application first:")
@@ -446,7 +580,7 @@ def main():
         return
     
     # Create tester
-    tester = VisualThemeTester()
+    tester = VisualThemeTester(session=session)
     
     # Run automated tests
     print("🤖 Running automated tests...")
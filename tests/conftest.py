@@ -2,43 +2,117 @@
 Pytest configuration and fixtures for the test suite.
 """
 import pytest
-import os
-import tempfile
+from sqlalchemy import event, insert
+from werkzeug.test import create_environ, run_wsgi_app
 from app import create_app
 from app.models import db, Prompt, Tag
 
 
+# Rows behind the sample fixtures below. They are inserted per test
+# rather than once per session: the savepoint rollback keeps them away from
+# tests that did not ask for them, and several tests create their own
+# "python" tag.
+SAMPLE_PROMPT_ROWS = tuple(
+    {
+        'title': f"Test Prompt {i+1}",
+        'content': f"Content for test prompt {i+1}",
+        'description': f"Description {i+1}",
+        'is_active': True
+    }
+    for i in range(5)
+)
+
+SEARCHABLE_PROMPT_ROWS = (
+    {'title': "Python Guide", 'content': "Learn Python"},
+    {'title': "JavaScript Tutorial", 'content': "Learn JS"}
+)
+
+SAMPLE_TAG_ROWS = tuple(
+    {'name': name, 'color': color}
+    for name, color in zip(
+        ["python", "javascript", "api", "testing", "documentation"],
+        ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6"]
+    )
+)
+
+
 @pytest.fixture(scope='session')
 def app():
     """Create application for the tests."""
-    # Create a temporary file for test database
-    db_fd, db_path = tempfile.mkstemp()
-    
-    # Create app with testing configuration
+    # The testing config points at sqlite:///:memory:, for which
+    # Flask-SQLAlchemy uses a StaticPool, so every session shares one database
     app = create_app('testing')
     app.config.update({
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
         'WTF_CSRF_ENABLED': False
     })
     
-    # Create the database and tables
+    # Create the database and tables once for the whole test session
     with app.app_context():
+        _tune_sqlite_for_tests(db.engine)
+        _enable_sqlite_savepoints(db.engine)
         db.create_all()
     
     yield app
+
+
+def _tune_sqlite_for_tests(engine):
+    """Trade durability for speed; the test database is thrown away anyway."""
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def _enable_sqlite_savepoints(engine):
+    """Let pysqlite run SAVEPOINTs inside an explicit outer transaction.
+    
+    The sqlite3 driver defers BEGIN until the first write, so a savepoint
+    released before that would commit for real. Take over transaction
+    handling and emit BEGIN ourselves.
+    """
+    @event.listens_for(engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
     
-    # Cleanup
-    os.close(db_fd)
-    os.unlink(db_path)
+    @event.listens_for(engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def client(app):
-    """Create a test client for the app."""
+    """Create a test client for the app, shared by every test.
+    
+    Database state is reset per test by db_session, not by the client.
+    """
     return app.test_client()
 
 
+@pytest.fixture
+def login_disabled(app, monkeypatch):
+    """Let the test client reach @login_required routes without logging in."""
+    monkeypatch.setitem(app.config, 'LOGIN_DISABLED', True)
+
+
+@pytest.fixture
+def wsgi_get(app):
+    """Return a helper that GETs a path straight through the WSGI app.
+    
+    Skips the test client's cookie jar, redirect handling and response
+    wrapper, so it only suits read-only requests that need none of those.
+    The helper returns the status line and the body bytes.
+    """
+    def _get(path):
+        app_iter, status, headers = run_wsgi_app(app.wsgi_app, create_environ(path), buffered=True)
+        return status, b''.join(app_iter)
+    
+    return _get
+
+
 @pytest.fixture(scope='function')
 def runner(app):
     """Create a test runner for the app's Click commands."""
@@ -47,17 +121,42 @@ def runner(app):
 
 @pytest.fixture(scope='function')
 def db_session(app):
-    """Create a clean database session for a test."""
+    """Create a database session whose changes are rolled back after the test.
+    
+    The session runs inside an outer transaction and turns its own commits
+    into SAVEPOINT releases, so rolling back the outer transaction undoes
+    everything the test wrote.
+    """
     with app.app_context():
-        # Clean all tables
-        db.session.query(Prompt).delete()
-        db.session.query(Tag).delete()
-        db.session.commit()
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        
+        # Flask-SQLAlchemy resolves binds from db.engines, not session.bind
+        engines = db.engines
+        engine = engines[None]
+        engines[None] = connection
+        db.session.registry.set(
+            db.session.session_factory(join_transaction_mode="create_savepoint")
+        )
         
         yield db.session
         
-        # Rollback any uncommitted transactions
-        db.session.rollback()
+        db.session.remove()
+        engines[None] = engine
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(autouse=True)
+def _rollback_app_writes(request):
+    """Run every test that uses the app inside db_session's rollback.
+    
+    Tests that only take client still commit through the app's session,
+    so without this their rows would outlive them. Test classes that
+    override app with a bare Flask app have no database to roll back.
+    """
+    if 'app' in request.fixturenames and 'sqlalchemy' in request.getfixturevalue('app').extensions:
+        request.getfixturevalue('db_session')
 
 
 @pytest.fixture
@@ -71,6 +170,11 @@ def sample_prompt(db_session):
     )
     db_session.add(prompt)
     db_session.commit()
+    
+    # API URLs of the prompt, built once for the tests that call them
+    prompt.url = f'/api/prompts/{prompt.id}'
+    prompt.restore_url = f'{prompt.url}/restore'
+    prompt.duplicate_url = f'{prompt.url}/duplicate'
     return prompt
 
 
@@ -86,16 +190,10 @@ def sample_tag(db_session):
 @pytest.fixture
 def sample_prompts(db_session):
     """Create multiple sample prompts for testing."""
-    prompts = []
-    for i in range(5):
-        prompt = Prompt(
-            title=f"Test Prompt {i+1}",
-            content=f"Content for test prompt {i+1}",
-            description=f"Description {i+1}",
-            is_active=True
-        )
-        prompts.append(prompt)
-        db_session.add(prompt)
+    prompts = db_session.scalars(
+        insert(Prompt).returning(Prompt, sort_by_parameter_order=True),
+        SAMPLE_PROMPT_ROWS
+    ).all()
     
     db_session.commit()
     return prompts
@@ -104,19 +202,27 @@ def sample_prompts(db_session):
 @pytest.fixture
 def sample_tags(db_session):
     """Create multiple sample tags for testing."""
-    tags = []
-    tag_names = ["python", "javascript", "api", "testing", "documentation"]
-    colors = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6"]
-    
-    for name, color in zip(tag_names, colors):
-        tag = Tag(name=name, color=color)
-        tags.append(tag)
-        db_session.add(tag)
+    tags = db_session.scalars(
+        insert(Tag).returning(Tag, sort_by_parameter_order=True),
+        SAMPLE_TAG_ROWS
+    ).all()
     
     db_session.commit()
     return tags
 
 
+@pytest.fixture
+def searchable_prompts(db_session):
+    """Create prompts where only the first one mentions Python."""
+    prompts = db_session.scalars(
+        insert(Prompt).returning(Prompt, sort_by_parameter_order=True),
+        SEARCHABLE_PROMPT_ROWS
+    ).all()
+    
+    db_session.commit()
+    return prompts
+
+
 @pytest.fixture
 def auth_headers():
     """Return headers for API authentication (if needed in future)."""
@@ -1,20 +1,21 @@
 """
 Integration tests for API endpoints.
 """
-import pytest
 import json
-from app.models import Prompt, Tag
+
+import pytest
+from app.models import Prompt, Tag, prompt_tags
 
 
 class TestPromptAPI:
     """Test prompt-related API endpoints."""
     
-    def test_get_prompts(self, client, sample_prompts):
+    def test_get_prompts(self, wsgi_get, sample_prompts):
         """Test GET /api/prompts endpoint."""
-        response = client.get('/api/prompts')
-        assert response.status_code == 200
+        status, body = wsgi_get('/api/prompts')
+        assert status.startswith('200')
         
-        data = json.loads(response.data)
+        data = json.loads(body)
         assert 'prompts' in data
         assert 'pagination' in data
         assert len(data['prompts']) == 5
@@ -25,37 +26,33 @@ class TestPromptAPI:
         response = client.get('/api/prompts?page=2&per_page=2')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['prompts']) == 2
         assert data['pagination']['page'] == 2
         assert data['pagination']['per_page'] == 2
         assert data['pagination']['has_prev'] is True
     
-    def test_get_prompts_with_search(self, client, db_session):
+    def test_get_prompts_with_search(self, client, searchable_prompts):
         """Test search functionality in prompts list."""
-        # Create searchable prompts
-        Prompt(title="Python Guide", content="Learn Python").save()
-        Prompt(title="JavaScript Tutorial", content="Learn JS").save()
-        
         response = client.get('/api/prompts?search=Python')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['prompts']) == 1
         assert data['prompts'][0]['title'] == "Python Guide"
     
-    def test_get_single_prompt(self, client, sample_prompt):
+    def test_get_single_prompt(self, wsgi_get, sample_prompt):
         """Test GET /api/prompts/{id} endpoint."""
-        response = client.get(f'/api/prompts/{sample_prompt.id}')
-        assert response.status_code == 200
+        status, body = wsgi_get(sample_prompt.url)
+        assert status.startswith('200')
         
-        data = json.loads(response.data)
+        data = json.loads(body)
         assert data['prompt']['id'] == sample_prompt.id
         assert data['prompt']['title'] == sample_prompt.title
         
         # Non-existent prompt
-        response = client.get('/api/prompts/9999')
-        assert response.status_code == 404
+        status, body = wsgi_get('/api/prompts/9999')
+        assert status.startswith('404')
     
     def test_create_prompt(self, client, db_session):
         """Test POST /api/prompts endpoint."""
@@ -68,30 +65,57 @@ class TestPromptAPI:
         
         response = client.post(
             '/api/prompts',
-            data=json.dumps(payload),
-            content_type='application/json'
+            json=payload
         )
         assert response.status_code == 201
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['prompt']['title'] == 'New Prompt'
         assert len(data['prompt']['tags']) == 2
+    
+    def test_create_prompts_bulk(self, client, db_session, login_disabled):
+        """Test POST /api/prompts/bulk endpoint."""
+        payload = {
+            'prompts': [
+                {'title': f'Bulk Prompt {i}', 'content': f'Bulk content {i}', 'tags': ['python']}
+                for i in range(10)
+            ]
+        }
         
-        # Verify in database
-        prompt = Prompt.query.get(data['prompt']['id'])
-        assert prompt is not None
-        assert prompt.title == 'New Prompt'
+        response = client.post(
+            '/api/prompts/bulk',
+            json=payload
+        )
+        assert response.status_code == 201
+        
+        data = response.get_json()
+        assert [prompt['title'] for prompt in data['prompts']] == [f'Bulk Prompt {i}' for i in range(10)]
+        assert all(len(prompt['tags']) == 1 for prompt in data['prompts'])
+        
+        # One invalid item rejects the whole batch
+        response = client.post(
+            '/api/prompts/bulk',
+            json={'prompts': [{'title': 'Valid', 'content': 'Content'}, {'title': ''}]}
+        )
+        assert response.status_code == 400
+        assert Prompt.query.filter_by(title='Valid').first() is None
+        
+        # Items must be prompt objects
+        response = client.post(
+            '/api/prompts/bulk',
+            json={'prompts': [{'title': 'Valid', 'content': 'Content'}, 'not a prompt']}
+        )
+        assert response.status_code == 400
     
     def test_create_prompt_validation(self, client):
         """Test validation in prompt creation."""
         # Missing required fields
         response = client.post(
             '/api/prompts',
-            data=json.dumps({'title': ''}),
-            content_type='application/json'
+            json={'title': ''}
         )
         assert response.status_code == 400
-        assert 'error' in json.loads(response.data)
+        assert b'"error"' in response.data
         
         # Invalid content type
         response = client.post(
@@ -109,23 +133,18 @@ class TestPromptAPI:
         }
         
         response = client.put(
-            f'/api/prompts/{sample_prompt.id}',
-            data=json.dumps(payload),
-            content_type='application/json'
+            sample_prompt.url,
+            json=payload
         )
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['prompt']['title'] == 'Updated Title'
-        
-        # Verify in database
-        prompt = Prompt.query.get(sample_prompt.id)
-        assert prompt.title == 'Updated Title'
     
     def test_delete_prompt(self, client, sample_prompt):
         """Test DELETE /api/prompts/{id} endpoint."""
         # Soft delete (default)
-        response = client.delete(f'/api/prompts/{sample_prompt.id}')
+        response = client.delete(sample_prompt.url)
         assert response.status_code == 200
         
         # Verify soft deleted
@@ -148,7 +167,7 @@ class TestPromptAPI:
         sample_prompt.save()
         
         # Restore
-        response = client.post(f'/api/prompts/{sample_prompt.id}/restore')
+        response = client.post(sample_prompt.restore_url)
         assert response.status_code == 200
         
         # Verify restored
@@ -160,13 +179,12 @@ class TestPromptAPI:
         payload = {'title': 'Duplicated Prompt'}
         
         response = client.post(
-            f'/api/prompts/{sample_prompt.id}/duplicate',
-            data=json.dumps(payload),
-            content_type='application/json'
+            sample_prompt.duplicate_url,
+            json=payload
         )
         assert response.status_code == 201
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['prompt']['title'] == 'Duplicated Prompt'
         assert data['prompt']['content'] == sample_prompt.content
         assert data['prompt']['id'] != sample_prompt.id
@@ -181,26 +199,21 @@ class TestPromptAPI:
         
         response = client.post(
             '/api/prompts/merge',
-            data=json.dumps(payload),
-            content_type='application/json'
+            json=payload
         )
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'merged_content' in data
         assert data['metadata']['prompt_count'] == 2
         assert sample_prompts[0].title in data['merged_content']
     
-    def test_search_prompts(self, client, db_session):
+    def test_search_prompts(self, client, searchable_prompts):
         """Test GET /api/prompts/search endpoint."""
-        # Create searchable prompts
-        Prompt(title="Python Guide", content="Learn Python").save()
-        Prompt(title="JS Tutorial", content="JavaScript basics").save()
-        
         response = client.get('/api/prompts/search?q=Python')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['count'] == 1
         assert data['prompts'][0]['title'] == "Python Guide"
         
@@ -217,30 +230,32 @@ class TestTagAPI:
         response = client.get('/api/tags')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['tags']) == 5
     
-    def test_get_popular_tags(self, client, sample_tags, sample_prompts):
+    def test_get_popular_tags(self, wsgi_get, db_session, sample_tags, sample_prompts):
         """Test GET /api/tags?popular=true endpoint."""
         # Add tags to prompts
-        sample_prompts[0].tags.append(sample_tags[0])
-        sample_prompts[1].tags.append(sample_tags[0])
-        sample_prompts[2].tags.append(sample_tags[1])
-        sample_prompts[0].save()
+        db_session.execute(prompt_tags.insert(), [
+            {'prompt_id': sample_prompts[0].id, 'tag_id': sample_tags[0].id},
+            {'prompt_id': sample_prompts[1].id, 'tag_id': sample_tags[0].id},
+            {'prompt_id': sample_prompts[2].id, 'tag_id': sample_tags[1].id}
+        ])
+        db_session.commit()
         
-        response = client.get('/api/tags?popular=true&limit=3')
-        assert response.status_code == 200
+        status, body = wsgi_get('/api/tags?popular=true&limit=3')
+        assert status.startswith('200')
         
-        data = json.loads(response.data)
+        data = json.loads(body)
         assert len(data['tags']) <= 3
         assert data['tags'][0]['usage_count'] >= data['tags'][1]['usage_count']
     
-    def test_get_single_tag(self, client, sample_tag):
+    def test_get_single_tag(self, wsgi_get, sample_tag):
         """Test GET /api/tags/{id} endpoint."""
-        response = client.get(f'/api/tags/{sample_tag.id}')
-        assert response.status_code == 200
+        status, body = wsgi_get(f'/api/tags/{sample_tag.id}')
+        assert status.startswith('200')
         
-        data = json.loads(response.data)
+        data = json.loads(body)
         assert data['tag']['id'] == sample_tag.id
         assert data['tag']['name'] == sample_tag.name
     
@@ -253,12 +268,11 @@ class TestTagAPI:
         
         response = client.post(
             '/api/tags',
-            data=json.dumps(payload),
-            content_type='application/json'
+            json=payload
         )
         assert response.status_code == 201
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['tag']['name'] == 'new-tag'  # Normalized
         assert data['tag']['color'] == '#FF5733'
     
@@ -271,12 +285,11 @@ class TestTagAPI:
         
         response = client.put(
             f'/api/tags/{sample_tag.id}',
-            data=json.dumps(payload),
-            content_type='application/json'
+            json=payload
         )
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['tag']['name'] == 'updated-tag'
         assert data['tag']['color'] == '#00FF00'
     
@@ -291,8 +304,10 @@ class TestTagAPI:
     def test_merge_tags(self, client, db_session):
         """Test POST /api/tags/merge endpoint."""
         # Create tags
-        source = Tag(name="source-tag").save()
-        target = Tag(name="target-tag").save()
+        source = Tag(name="source-tag")
+        target = Tag(name="target-tag")
+        db_session.add_all([source, target])
+        db_session.commit()
         
         payload = {
             'source_id': source.id,
@@ -301,8 +316,7 @@ class TestTagAPI:
         
         response = client.post(
             '/api/tags/merge',
-            data=json.dumps(payload),
-            content_type='application/json'
+            json=payload
         )
         assert response.status_code == 200
         
@@ -310,16 +324,19 @@ class TestTagAPI:
         assert Tag.query.get(source.id) is None
         assert Tag.query.get(target.id) is not None
     
-    def test_tag_statistics(self, client, sample_tags, sample_prompts):
+    def test_tag_statistics(self, client, db_session, sample_tags, sample_prompts):
         """Test GET /api/tags/statistics endpoint."""
         # Add tags to prompts
-        sample_prompts[0].tags.extend([sample_tags[0], sample_tags[1]])
-        sample_prompts[0].save()
+        db_session.execute(prompt_tags.insert(), [
+            {'prompt_id': sample_prompts[0].id, 'tag_id': sample_tags[0].id},
+            {'prompt_id': sample_prompts[0].id, 'tag_id': sample_tags[1].id}
+        ])
+        db_session.commit()
         
         response = client.get('/api/tags/statistics')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         stats = data['statistics']
         assert stats['total_tags'] == 5
         assert stats['used_tags'] == 2
@@ -329,29 +346,32 @@ class TestTagAPI:
 class TestGeneralAPI:
     """Test general API endpoints."""
     
-    def test_statistics_endpoint(self, client, db_session):
+    def test_statistics_endpoint(self, wsgi_get, db_session):
         """Test GET /api/statistics endpoint."""
-        # Create test data
-        Prompt(title="Active", content="C1", is_active=True).save()
-        Prompt(title="Inactive", content="C2", is_active=False).save()
-        Tag(name="tag1").save()
-        Tag(name="tag2").save()
-        
-        response = client.get('/api/statistics')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
+        # Create test data in one flush and commit
+        db_session.add_all([
+            Prompt(title="Active", content="C1", is_active=True),
+            Prompt(title="Inactive", content="C2", is_active=False),
+            Tag(name="tag1"),
+            Tag(name="tag2")
+        ])
+        db_session.commit()
+        
+        status, body = wsgi_get('/api/statistics')
+        assert status.startswith('200')
+        
+        data = json.loads(body)
         assert 'prompts' in data
         assert 'tags' in data
         assert data['prompts']['total_prompts'] == 2
         assert data['tags']['total_tags'] == 2
     
-    def test_health_check(self, client):
+    def test_health_check(self, wsgi_get):
         """Test GET /api/health endpoint."""
-        response = client.get('/api/health')
-        assert response.status_code == 200
+        status, body = wsgi_get('/api/health')
+        assert status.startswith('200')
         
-        data = json.loads(response.data)
+        data = json.loads(body)
         assert data['status'] == 'healthy'
         assert 'version' in data
     
@@ -360,7 +380,7 @@ class TestGeneralAPI:
         # 404 error
         response = client.get('/api/nonexistent')
         assert response.status_code == 404
-        assert 'error' in json.loads(response.data)
+        assert b'"error"' in response.data
         
         # Invalid JSON
         response = client.post(
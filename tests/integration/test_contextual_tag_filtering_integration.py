@@ -4,51 +4,25 @@ Integration tests for contextual tag filtering functionality.
 Tests cover:
 - Complete workflow from status filter change to tag update
 - AJAX endpoint integration with real database
-- JavaScript DOM updates
+- Data behind the JavaScript tag updates
 - Error scenarios in real environment
 """
 
 import pytest
-import json
+import time
 from unittest.mock import patch, MagicMock
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
 from flask import Flask
-from app import create_app
+from sqlalchemy import text
 from app.models.tag import Tag
 from app.models.prompt import Prompt
-from app.models.base import db
 from app.services.tag_service import TagService
 from app.repositories.tag_repository import TagRepository
 
 
+@pytest.mark.usefixtures('db_session')
 class TestContextualTagFilteringIntegration:
     """Integration tests for contextual tag filtering workflow."""
     
-    @pytest.fixture
-    def app(self):
-        """Create Flask app for testing."""
-        app = create_app('testing')
-        return app
-    
-    @pytest.fixture
-    def client(self, app):
-        """Create test client."""
-        return app.test_client()
-    
-    @pytest.fixture
-    def db_session(self, app):
-        """Create database session."""
-        with app.app_context():
-            db.create_all()
-            yield db.session
-            db.session.remove()
-            db.drop_all()
-    
     @pytest.fixture
     def sample_data(self, db_session):
         """Create sample data for testing."""
@@ -59,9 +33,6 @@ class TestContextualTagFilteringIntegration:
         tag4 = Tag(name="html", color="#e34f26")
         tag5 = Tag(name="css", color="#1572b6")
         
-        db_session.add_all([tag1, tag2, tag3, tag4, tag5])
-        db_session.commit()
-        
         # Create prompts with different statuses
         prompt1 = Prompt(title="Python Guide", content="Python tutorial", is_active=True)
         prompt2 = Prompt(title="JS Tutorial", content="JavaScript guide", is_active=True)
@@ -69,9 +40,6 @@ class TestContextualTagFilteringIntegration:
         prompt4 = Prompt(title="HTML Intro", content="HTML basics", is_active=True)
         prompt5 = Prompt(title="CSS Styling", content="CSS guide", is_active=False)
         
-        db_session.add_all([prompt1, prompt2, prompt3, prompt4, prompt5])
-        db_session.commit()
-        
         # Associate tags with prompts
         prompt1.tags = [tag1, tag2]  # python, javascript (active)
         prompt2.tags = [tag2, tag4]  # javascript, html (active)
@@ -79,6 +47,8 @@ class TestContextualTagFilteringIntegration:
         prompt4.tags = [tag4, tag5]  # html, css (active + inactive)
         prompt5.tags = [tag5]        # css (inactive)
         
+        # Tags, prompts and associations go out in one flush and commit
+        db_session.add_all([prompt1, prompt2, prompt3, prompt4, prompt5])
         db_session.commit()
         
         return {
@@ -86,19 +56,24 @@ class TestContextualTagFilteringIntegration:
             'prompts': [prompt1, prompt2, prompt3, prompt4, prompt5]
         }
     
-    def test_api_endpoint_with_real_database(self, client, db_session, sample_data):
+    @staticmethod
+    def _by_name(rows):
+        """Index popular-tag rows by tag name."""
+        return {row['tag'].name: row for row in rows}
+    
+    def test_api_endpoint_with_real_database(self, client, sample_data):
         """Test API endpoint with real database queries."""
         # Test getting all tags
         response = client.get('/api/tags/popular')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) > 0
         
         # Test getting active tags only
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         
         # Verify only active tags are returned
@@ -111,7 +86,7 @@ class TestContextualTagFilteringIntegration:
         # Test getting inactive tags only
         response = client.get('/api/tags/popular?is_active=false')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         
         # Verify inactive tags are returned
@@ -119,250 +94,189 @@ class TestContextualTagFilteringIntegration:
         assert 'sql' in inactive_tags
         assert 'css' in inactive_tags
     
-    def test_tag_service_integration(self, app, db_session, sample_data):
+    def test_tag_service_integration(self, sample_data):
         """Test TagService integration with real database."""
-        with app.app_context():
-            tag_service = TagService(TagRepository(db_session))
-            
-            # Test getting all tags
-            all_tags = tag_service.get_popular_tags(limit=10, is_active=None)
-            assert len(all_tags) > 0
-            
-            # Test getting active tags
-            active_tags = tag_service.get_popular_tags(limit=10, is_active=True)
-            assert len(active_tags) > 0
-            
-            # Verify active tags have correct counts
-            for tag_data in active_tags:
-                if tag_data['tag'].name == 'python':
-                    assert tag_data['usage_count'] >= 1
-                elif tag_data['tag'].name == 'javascript':
-                    assert tag_data['usage_count'] >= 2
-            
-            # Test getting inactive tags
-            inactive_tags = tag_service.get_popular_tags(limit=10, is_active=False)
-            assert len(inactive_tags) > 0
-            
-            # Verify inactive tags have correct counts
-            for tag_data in inactive_tags:
-                if tag_data['tag'].name == 'sql':
-                    assert tag_data['usage_count'] >= 1
-                elif tag_data['tag'].name == 'css':
-                    assert tag_data['usage_count'] >= 1
+        tag_service = TagService()
+        
+        # Test getting all tags
+        all_tags = tag_service.get_popular_tags(limit=10, is_active=None)
+        assert len(all_tags) > 0
+        
+        # Test getting active tags
+        active_tags = tag_service.get_popular_tags(limit=10, is_active=True)
+        assert len(active_tags) > 0
+        
+        # Verify active tags have correct counts
+        active_by_name = self._by_name(active_tags)
+        assert active_by_name['python']['usage_count'] >= 1
+        assert active_by_name['javascript']['usage_count'] >= 2
+        
+        # Test getting inactive tags
+        inactive_tags = tag_service.get_popular_tags(limit=10, is_active=False)
+        assert len(inactive_tags) > 0
+        
+        # Verify inactive tags have correct counts
+        inactive_by_name = self._by_name(inactive_tags)
+        assert inactive_by_name['sql']['usage_count'] >= 1
+        assert inactive_by_name['css']['usage_count'] >= 1
     
-    def test_parameter_conversion_integration(self, client, db_session, sample_data):
+    @pytest.mark.parametrize('query_string', [
+        'is_active=true',
+        'is_active=false',
+        'is_active=all',
+        'is_active=invalid',  # Invalid parameter
+        '',                   # No parameter
+    ])
+    def test_parameter_conversion_integration(self, client, sample_data, query_string):
         """Test parameter conversion in real API calls."""
-        # Test string 'true'
-        response = client.get('/api/tags/popular?is_active=true')
-        assert response.status_code == 200
-        
-        # Test string 'false'
-        response = client.get('/api/tags/popular?is_active=false')
-        assert response.status_code == 200
-        
-        # Test 'all'
-        response = client.get('/api/tags/popular?is_active=all')
-        assert response.status_code == 200
-        
-        # Test invalid parameter
-        response = client.get('/api/tags/popular?is_active=invalid')
-        assert response.status_code == 200
-        
-        # Test no parameter
-        response = client.get('/api/tags/popular')
+        response = client.get(f'/api/tags/popular?{query_string}')
         assert response.status_code == 200
     
-    def test_error_handling_integration(self, client, db_session):
+    def test_error_handling_integration(self, client):
         """Test error handling in real environment."""
         # Test with empty database
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 0
     
-    @pytest.mark.selenium
-    def test_javascript_dom_updates(self, app, db_session, sample_data):
-        """Test JavaScript DOM updates with Selenium (requires Chrome)."""
-        # This test requires Chrome WebDriver
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            
-            driver = webdriver.Chrome(options=chrome_options)
-            
-            try:
-                # Navigate to prompts page
-                driver.get("http://localhost:5001/prompts")
-                
-                # Wait for page to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "popular-tags-container"))
-                )
-                
-                # Get initial tags
-                initial_tags = driver.find_elements(By.CSS_SELECTOR, ".popular-tags-container .tag-filter")
-                initial_count = len(initial_tags)
-                
-                # Change status filter to Active
-                active_radio = driver.find_element(By.CSS_SELECTOR, 'input[name="is_active"][value="true"]')
-                active_radio.click()
-                
-                # Wait for tags to update
-                WebDriverWait(driver, 5).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, ".popular-tags-container .tag-filter")) != initial_count
-                )
-                
-                # Verify tags changed
-                updated_tags = driver.find_elements(By.CSS_SELECTOR, ".popular-tags-container .tag-filter")
-                assert len(updated_tags) != initial_count
-                
-                # Change status filter to Inactive
-                inactive_radio = driver.find_element(By.CSS_SELECTOR, 'input[name="is_active"][value="false"]')
-                inactive_radio.click()
-                
-                # Wait for tags to update again
-                WebDriverWait(driver, 5).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, ".popular-tags-container .tag-filter")) != len(updated_tags)
-                )
-                
-            finally:
-                driver.quit()
-                
-        except Exception as e:
-            pytest.skip(f"Selenium test skipped: {e}")
+    def test_status_filter_tag_updates(self, client, sample_data):
+        """Test the tag lists the status filter swaps into the page."""
+        # The status radios fetch /api/tags/popular?is_active=<value> and
+        # re-render the popular tags from it; rendering is covered by the JS
+        # unit tests, so check the data each filter change receives.
+        tag_names = {}
+        for status in ('all', 'true', 'false'):
+            response = client.get(f'/api/tags/popular?is_active={status}')
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data['success'] is True
+            tag_names[status] = {tag['name'] for tag in data['tags']}
+        
+        # Changing the filter changes the tags shown
+        assert tag_names['true'] != tag_names['all']
+        assert tag_names['false'] != tag_names['true']
+        assert 'python' in tag_names['true']
+        assert 'python' not in tag_names['false']
+        assert 'sql' in tag_names['false']
     
-    def test_loading_states_integration(self, client, db_session, sample_data):
+    def test_loading_states_integration(self, client, sample_data):
         """Test loading states in real environment."""
-        # Simulate slow database query
+        # Stand in for the database query; sleeping here only slowed the suite
         with patch('app.services.tag_service.TagService.get_popular_tags') as mock_get_tags:
-            # Make the mock sleep to simulate slow query
-            import time
-            def slow_get_tags(*args, **kwargs):
-                time.sleep(0.1)
-                return [{'tag': sample_data['tags'][0], 'usage_count': 1}]
-            
-            mock_get_tags.side_effect = slow_get_tags
+            mock_get_tags.return_value = [{'tag': sample_data['tags'][0], 'usage_count': 1}]
             
             # Make request
             response = client.get('/api/tags/popular?is_active=true')
             assert response.status_code == 200
+            mock_get_tags.assert_called_once_with(limit=10, is_active=True)
+            assert response.get_json()['tags'][0]['name'] == 'python'
     
-    def test_data_consistency_integration(self, app, db_session, sample_data):
+    def test_data_consistency_integration(self, sample_data):
         """Test data consistency across different status filters."""
-        with app.app_context():
-            tag_service = TagService(TagRepository(db_session))
-            
-            # Get all tags
-            all_tags = tag_service.get_popular_tags(limit=50, is_active=None)
-            all_tag_names = {tag_data['tag'].name for tag_data in all_tags}
-            
-            # Get active tags
-            active_tags = tag_service.get_popular_tags(limit=50, is_active=True)
-            active_tag_names = {tag_data['tag'].name for tag_data in active_tags}
-            
-            # Get inactive tags
-            inactive_tags = tag_service.get_popular_tags(limit=50, is_active=False)
-            inactive_tag_names = {tag_data['tag'].name for tag_data in inactive_tags}
-            
-            # Verify consistency
-            # Active + Inactive should be subset of All
-            combined = active_tag_names.union(inactive_tag_names)
-            assert combined.issubset(all_tag_names)
-            
-            # Active and Inactive should not overlap (for tags with usage > 0)
-            active_with_usage = {tag_data['tag'].name for tag_data in active_tags if tag_data['usage_count'] > 0}
-            inactive_with_usage = {tag_data['tag'].name for tag_data in inactive_tags if tag_data['usage_count'] > 0}
-            
-            # They can overlap if a tag is used in both active and inactive prompts
-            # This is expected behavior
-    
-    def test_performance_integration(self, client, db_session, sample_data):
-        """Test performance of tag filtering."""
-        import time
+        tag_service = TagService()
         
-        # Test response time for different status filters
-        start_time = time.time()
-        response = client.get('/api/tags/popular?is_active=true')
-        active_time = time.time() - start_time
+        # Get the tags of every status from one query
+        tags_by_status = tag_service.get_popular_tags_by_status(limit=50)
+        usage = {
+            status: {tag_data['tag'].name: tag_data['usage_count'] for tag_data in tags}
+            for status, tags in tags_by_status.items()
+        }
+        all_tag_names = frozenset(usage['all'])
+        active_tag_names = frozenset(usage['active'])
+        inactive_tag_names = frozenset(usage['inactive'])
         
-        start_time = time.time()
-        response = client.get('/api/tags/popular?is_active=false')
-        inactive_time = time.time() - start_time
+        # Verify consistency
+        # Active and Inactive should each be a subset of All
+        assert active_tag_names <= all_tag_names
+        assert inactive_tag_names <= all_tag_names
         
-        start_time = time.time()
-        response = client.get('/api/tags/popular')
-        all_time = time.time() - start_time
+        # They can overlap if a tag is used in both active and inactive prompts
+        assert active_tag_names & inactive_tag_names == {'css'}
+        
+        # A tag's usage splits between the two statuses
+        for name, count in usage['all'].items():
+            assert usage['active'].get(name, 0) + usage['inactive'].get(name, 0) == count
+    
+    def test_performance_integration(self, client, sample_data):
+        """Test performance of tag filtering."""
+        # Requests run one after another: the in-memory test database lives
+        # on a single connection, which concurrent requests would share
+        times = {}
+        for label, url in (
+            ('Active', '/api/tags/popular?is_active=true'),
+            ('Inactive', '/api/tags/popular?is_active=false'),
+            ('All', '/api/tags/popular'),
+        ):
+            start_time = time.perf_counter()
+            client.get(url)
+            times[label] = time.perf_counter() - start_time
         
         # All responses should complete within reasonable time
-        assert active_time < 1.0, f"Active filter took {active_time:.2f}s"
-        assert inactive_time < 1.0, f"Inactive filter took {inactive_time:.2f}s"
-        assert all_time < 1.0, f"All filter took {all_time:.2f}s"
+        slowest = max(times, key=times.get)
+        assert times[slowest] < 1.0, f"{slowest} filter took {times[slowest]:.2f}s"
     
-    def test_backward_compatibility_integration(self, app, db_session, sample_data):
+    def test_popular_tags_query_plan(self, db_session):
+        """Test that the popular tags query looks rows up by index."""
+        def plan(is_active):
+            query = TagRepository()._popular_tags_query(is_active)
+            sql = query.statement.compile(
+                dialect=db_session.get_bind().dialect,
+                compile_kwargs={'literal_binds': True}
+            )
+            return [row[-1] for row in db_session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        
+        # All statuses: associations are found through the tag_id index
+        assert any(step.startswith('SEARCH prompt_tags USING INDEX') for step in plan(None))
+        
+        # Status filter: each association row fetches its prompt by primary key
+        for is_active in (True, False):
+            steps = plan(is_active)
+            assert any(step.startswith('SEARCH prompts') for step in steps)
+            assert not any(step.startswith('SCAN prompts') for step in steps)
+    
+    def test_backward_compatibility_integration(self, sample_data):
         """Test backward compatibility with existing code."""
-        with app.app_context():
-            tag_service = TagService(TagRepository(db_session))
-            
-            # Test old method call (without is_active parameter)
-            old_result = tag_service.get_popular_tags(limit=5)
-            assert len(old_result) > 0
-            
-            # Test new method call with None
-            new_result = tag_service.get_popular_tags(limit=5, is_active=None)
-            assert len(new_result) > 0
-            
-            # Results should be equivalent
-            assert len(old_result) == len(new_result)
+        tag_service = TagService()
+        
+        # Test old method call (without is_active parameter)
+        old_result = tag_service.get_popular_tags(limit=5)
+        assert len(old_result) > 0
+        
+        # Test new method call with None
+        new_result = tag_service.get_popular_tags(limit=5, is_active=None)
+        assert len(new_result) > 0
+        
+        # Results should be equivalent
+        assert len(old_result) == len(new_result)
     
-    def test_edge_cases_integration(self, client, db_session):
+    def test_edge_cases_integration(self, client):
         """Test edge cases in real environment."""
         # Test with no tags in database
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 0
         
         # Test with no prompts in database
         response = client.get('/api/tags/popular?is_active=false')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 0
         
         # Test with very large limit
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
 
 
 class TestContextualFilteringWorkflow:
     """Test complete workflow scenarios."""
     
-    @pytest.fixture
-    def app(self):
-        """Create Flask app for testing."""
-        app = create_app('testing')
-        return app
-    
-    @pytest.fixture
-    def client(self, app):
-        """Create test client."""
-        return app.test_client()
-    
-    @pytest.fixture
-    def db_session(self, app):
-        """Create database session."""
-        with app.app_context():
-            db.create_all()
-            yield db.session
-            db.session.remove()
-            db.drop_all()
-    
     def test_complete_workflow_scenario_1(self, client, db_session):
         """Test complete workflow: User changes status filter."""
         # Setup: Create test data
@@ -380,7 +294,7 @@ class TestContextualFilteringWorkflow:
         # Step 1: Get all tags
         response = client.get('/api/tags/popular')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 1
         assert data['tags'][0]['usage_count'] == 2  # Used in both active and inactive
@@ -388,7 +302,7 @@ class TestContextualFilteringWorkflow:
         # Step 2: Get active tags only
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 1
         assert data['tags'][0]['usage_count'] == 1  # Used only in active
@@ -396,7 +310,7 @@ class TestContextualFilteringWorkflow:
         # Step 3: Get inactive tags only
         response = client.get('/api/tags/popular?is_active=false')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         assert len(data['tags']) == 1
         assert data['tags'][0]['usage_count'] == 1  # Used only in inactive
@@ -421,7 +335,7 @@ class TestContextualFilteringWorkflow:
         # Test active filter
         response = client.get('/api/tags/popular?is_active=true')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         
         tag_names = [tag['name'] for tag in data['tags']]
@@ -432,7 +346,7 @@ class TestContextualFilteringWorkflow:
         # Test inactive filter
         response = client.get('/api/tags/popular?is_active=false')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['success'] is True
         
         tag_names = [tag['name'] for tag in data['tags']]
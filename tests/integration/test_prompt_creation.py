@@ -2,29 +2,17 @@
 Integration tests for prompt creation functionality.
 """
 import pytest
-import requests
-import time
-from app import create_app
-from app.models import db
 from app.services import PromptService
 
 
 class TestPromptCreation:
     """Test prompt creation through web interface."""
     
-    @pytest.fixture
-    def app(self):
-        """Create test application."""
-        app = create_app('testing')
-        with app.app_context():
-            db.create_all()
-            yield app
-            db.drop_all()
-    
-    @pytest.fixture
-    def client(self, app):
-        """Create test client."""
-        return app.test_client()
+    @staticmethod
+    def _pop_flashes(client):
+        """Take the flashed messages out of the client's session."""
+        with client.session_transaction() as session:
+            return session.pop('_flashes', [])
     
     def test_create_prompt_page_accessible(self, client):
         """Test that create prompt page is accessible."""
@@ -32,7 +20,7 @@ class TestPromptCreation:
         assert response.status_code == 200
         assert b'Create New Prompt' in response.data
     
-    def test_create_prompt_success(self, client):
+    def test_create_prompt_success(self, client, db_session):
         """Test successful prompt creation."""
         form_data = {
             'title': 'Test Integration Prompt',
@@ -56,7 +44,7 @@ class TestPromptCreation:
         assert b'Test Integration Prompt' in view_response.data
         assert b'This is a test prompt for integration testing.' in view_response.data
     
-    def test_create_prompt_validation_errors(self, client):
+    def test_create_prompt_validation_errors(self, client, db_session):
         """Test validation errors when creating prompt."""
         # Test missing title
         form_data = {
@@ -65,9 +53,10 @@ class TestPromptCreation:
             'is_active': 'true'
         }
         
-        response = client.post('/prompts/create', data=form_data, follow_redirects=True)
-        assert response.status_code == 200
-        assert b'Title is required' in response.data
+        response = client.post('/prompts/create', data=form_data)
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/prompts/create')
+        assert ('error', 'Title is required') in self._pop_flashes(client)
         
         # Test missing content
         form_data = {
@@ -76,11 +65,12 @@ class TestPromptCreation:
             'is_active': 'true'
         }
         
-        response = client.post('/prompts/create', data=form_data, follow_redirects=True)
-        assert response.status_code == 200
-        assert b'Content is required' in response.data
+        response = client.post('/prompts/create', data=form_data)
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/prompts/create')
+        assert ('error', 'Content is required') in self._pop_flashes(client)
     
-    def test_create_prompt_with_tags(self, client):
+    def test_create_prompt_with_tags(self, client, db_session):
         """Test prompt creation with tags."""
         form_data = {
             'title': 'Tagged Prompt',
@@ -100,7 +90,7 @@ class TestPromptCreation:
         assert b'testing' in view_response.data
         assert b'integration' in view_response.data
     
-    def test_create_prompt_inactive(self, client):
+    def test_create_prompt_inactive(self, client, db_session):
         """Test creating inactive prompt."""
         form_data = {
             'title': 'Inactive Prompt',
@@ -121,52 +111,41 @@ class TestPromptCreation:
 class TestPromptService:
     """Test prompt service directly."""
     
-    @pytest.fixture
-    def app(self):
-        """Create test application."""
-        app = create_app('testing')
-        with app.app_context():
-            db.create_all()
-            yield app
-            db.drop_all()
-    
-    def test_create_prompt_service(self, app):
+    def test_create_prompt_service(self, db_session):
         """Test prompt creation through service."""
-        with app.app_context():
-            service = PromptService()
-            
-            data = {
-                'title': 'Service Test Prompt',
-                'content': 'Test content for service',
-                'description': 'Service test description',
-                'tags': ['service', 'test'],
-                'is_active': True
-            }
-            
-            prompt = service.create_prompt(data)
-            
-            assert prompt.id is not None
-            assert prompt.title == 'Service Test Prompt'
-            assert prompt.content == 'Test content for service'
-            assert prompt.is_active is True
-            assert len(prompt.tags) == 2
-            assert any(tag.name == 'service' for tag in prompt.tags)
-            assert any(tag.name == 'test' for tag in prompt.tags)
+        service = PromptService()
+        
+        data = {
+            'title': 'Service Test Prompt',
+            'content': 'Test content for service',
+            'description': 'Service test description',
+            'tags': ['service', 'test'],
+            'is_active': True
+        }
+        
+        prompt = service.create_prompt(data)
+        
+        assert prompt.id is not None
+        assert prompt.title == 'Service Test Prompt'
+        assert prompt.content == 'Test content for service'
+        assert prompt.is_active is True
+        assert len(prompt.tags) == 2
+        assert any(tag.name == 'service' for tag in prompt.tags)
+        assert any(tag.name == 'test' for tag in prompt.tags)
     
-    def test_create_prompt_validation(self, app):
+    def test_create_prompt_validation(self, db_session):
         """Test prompt validation in service."""
-        with app.app_context():
-            service = PromptService()
-            
-            # Test missing title
-            with pytest.raises(ValueError, match="Title is required"):
-                service.create_prompt({'content': 'Some content'})
-            
-            # Test missing content
-            with pytest.raises(ValueError, match="Content is required"):
-                service.create_prompt({'title': 'Some title'})
-            
-            # Test title too long
-            long_title = 'a' * 256
-            with pytest.raises(ValueError, match="Title must be less than 255 characters"):
-                service.create_prompt({'title': long_title, 'content': 'Some content'}) 
\ No newline at end of file
+        service = PromptService()
+        
+        # Test missing title
+        with pytest.raises(ValueError, match="Title is required"):
+            service.create_prompt({'content': 'Some content'})
+        
+        # Test missing content
+        with pytest.raises(ValueError, match="Content is required"):
+            service.create_prompt({'title': 'Some title'})
+        
+        # Test title too long
+        long_title = 'a' * 256
+        with pytest.raises(ValueError, match="Title must be less than 255 characters"):
+            service.create_prompt({'title': long_title, 'content': 'Some content'}) 
\ No newline at end of file
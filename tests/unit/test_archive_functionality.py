@@ -1,58 +1,70 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import create_autospec, patch
 from app.models.prompt import Prompt
 from app.services.prompt_service import PromptService
 from app.repositories.prompt_repository import PromptRepository
 
 
+# Мок репозитория создаётся один раз: спецификация PromptRepository
+# разбирается при импорте, а между тестами мок только сбрасывается
+_REPO_MOCK = create_autospec(PromptRepository, instance=True)
+
+
 class TestArchiveFunctionality:
     """Тесты для функциональности архивирования промптов."""
     
-    def setup_method(self):
-        """Настройка перед каждым тестом."""
-        self.mock_repo = Mock(spec=PromptRepository)
-        self.prompt_service = PromptService()
-        self.prompt_service.prompt_repo = self.mock_repo
+    @pytest.fixture(scope='class')
+    def prompt_service(self):
+        """Сервис, общий для всех тестов класса, с мок-репозиторием."""
+        prompt_service = PromptService()
+        prompt_service.prompt_repo = _REPO_MOCK
+        return prompt_service
+    
+    @pytest.fixture
+    def mock_repo(self, prompt_service):
+        """Мок репозитория, сброшенный перед каждым тестом."""
+        _REPO_MOCK.reset_mock(return_value=True, side_effect=True)
+        return _REPO_MOCK
     
-    def test_archive_prompt_success(self):
+    def test_archive_prompt_success(self, prompt_service, mock_repo):
         """Тест успешного архивирования промпта."""
         # Arrange
         prompt_id = 1
-        self.mock_repo.soft_delete.return_value = True
+        mock_repo.soft_delete.return_value = True
         
         # Act
-        result = self.prompt_service.archive_prompt(prompt_id)
+        result = prompt_service.archive_prompt(prompt_id)
         
         # Assert
         assert result is True
-        self.mock_repo.soft_delete.assert_called_once_with(prompt_id)
+        mock_repo.soft_delete.assert_called_once_with(prompt_id)
     
-    def test_archive_prompt_not_found(self):
+    def test_archive_prompt_not_found(self, prompt_service, mock_repo):
         """Тест архивирования несуществующего промпта."""
         # Arrange
         prompt_id = 999
-        self.mock_repo.soft_delete.return_value = False
+        mock_repo.soft_delete.return_value = False
         
         # Act
-        result = self.prompt_service.archive_prompt(prompt_id)
+        result = prompt_service.archive_prompt(prompt_id)
         
         # Assert
         assert result is False
-        self.mock_repo.soft_delete.assert_called_once_with(prompt_id)
+        mock_repo.soft_delete.assert_called_once_with(prompt_id)
     
-    def test_archive_prompt_uses_soft_delete(self):
+    def test_archive_prompt_uses_soft_delete(self, prompt_service, mock_repo):
         """Тест что архивирование использует метод soft_delete."""
         # Arrange
         prompt_id = 1
-        self.mock_repo.soft_delete.return_value = True
+        mock_repo.soft_delete.return_value = True
         
         # Act
-        self.prompt_service.archive_prompt(prompt_id)
+        prompt_service.archive_prompt(prompt_id)
         
         # Assert
-        self.mock_repo.soft_delete.assert_called_once_with(prompt_id)
+        mock_repo.soft_delete.assert_called_once_with(prompt_id)
         # Убеждаемся что не вызывается hard delete
-        self.mock_repo.delete.assert_not_called()
+        mock_repo.delete.assert_not_called()
 
 
 class TestPromptModelArchive:
@@ -9,8 +9,8 @@ Tests cover:
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
-from sqlalchemy.orm import Session
 from app.repositories.tag_repository import TagRepository
 from app.services.tag_service import TagService
 from app.controllers.prompt_controller import get_popular_tags_api
@@ -25,13 +25,30 @@ class TestTagRepositoryContextualFiltering:
     
     @pytest.fixture
     def mock_session(self):
-        """Create a mock database session."""
-        return Mock(spec=Session)
+        """Create a stub database session; the repository only calls query()."""
+        return SimpleNamespace(query=MagicMock())
     
     @pytest.fixture
     def tag_repo(self, mock_session):
         """Create TagRepository instance with mock session."""
-        return TagRepository(mock_session)
+        tag_repo = TagRepository()
+        tag_repo.session = mock_session
+        return tag_repo
+    
+    @pytest.fixture
+    def mock_chain(self, mock_session):
+        """Return a factory that wires the session's query chain to results."""
+        def build(results, joined=False):
+            # Status filters join prompt_tags and prompts; no filter outer-joins prompt_tags
+            mock_query = Mock()
+            mock_session.query.return_value = mock_query
+            if joined:
+                mock_joined = mock_query.join.return_value.join.return_value
+            else:
+                mock_joined = mock_query.outerjoin.return_value
+            mock_joined.group_by.return_value.order_by.return_value.limit.return_value.all.return_value = results
+            return mock_query
+        return build
     
     @pytest.fixture
     def sample_tags(self):
@@ -55,7 +72,7 @@ class TestTagRepositoryContextualFiltering:
             Prompt(id=5, title="CSS Styling", is_active=False)
         ]
     
-    def test_get_popular_tags_all_statuses(self, tag_repo, mock_session, sample_tags):
+    def test_get_popular_tags_all_statuses(self, tag_repo, mock_session, mock_chain, sample_tags):
         """Test getting popular tags without status filter (all tags)."""
         # Mock query results
         mock_results = [
@@ -65,18 +82,7 @@ class TestTagRepositoryContextualFiltering:
         ]
         
         # Mock the query chain
-        mock_query = Mock()
-        mock_outerjoin = Mock()
-        mock_group_by = Mock()
-        mock_order_by = Mock()
-        mock_limit = Mock()
-        
-        mock_session.query.return_value = mock_query
-        mock_query.outerjoin.return_value = mock_outerjoin
-        mock_outerjoin.group_by.return_value = mock_group_by
-        mock_group_by.order_by.return_value = mock_order_by
-        mock_order_by.limit.return_value = mock_limit
-        mock_limit.all.return_value = mock_results
+        mock_query = mock_chain(mock_results)
         
         # Execute method
         result = tag_repo.get_popular_tags(limit=3, is_active=None)
@@ -90,10 +96,12 @@ class TestTagRepositoryContextualFiltering:
         assert result[2]['tag'].name == "sql"
         assert result[2]['usage_count'] == 2
         
-        # Verify query was called correctly
+        # Verify query was called correctly; no filter keeps unused tags via an outer join
         mock_session.query.assert_called_once()
+        mock_query.outerjoin.assert_called_once()
+        mock_query.join.assert_not_called()
     
-    def test_get_popular_tags_active_only(self, tag_repo, mock_session, sample_tags, sample_prompts):
+    def test_get_popular_tags_active_only(self, tag_repo, mock_chain, sample_tags, sample_prompts):
         """Test getting popular tags for active prompts only."""
         # Mock query results for active prompts
         mock_results = [
@@ -103,20 +111,7 @@ class TestTagRepositoryContextualFiltering:
         ]
         
         # Mock the query chain with JOIN
-        mock_query = Mock()
-        mock_join = Mock()
-        mock_filter = Mock()
-        mock_group_by = Mock()
-        mock_order_by = Mock()
-        mock_limit = Mock()
-        
-        mock_session.query.return_value = mock_query
-        mock_query.join.return_value = mock_join
-        mock_join.filter.return_value = mock_filter
-        mock_filter.group_by.return_value = mock_group_by
-        mock_group_by.order_by.return_value = mock_order_by
-        mock_order_by.limit.return_value = mock_limit
-        mock_limit.all.return_value = mock_results
+        mock_query = mock_chain(mock_results, joined=True)
         
         # Execute method
         result = tag_repo.get_popular_tags(limit=3, is_active=True)
@@ -133,7 +128,7 @@ class TestTagRepositoryContextualFiltering:
         # Verify JOIN was used for active filter
         mock_query.join.assert_called_once()
     
-    def test_get_popular_tags_inactive_only(self, tag_repo, mock_session, sample_tags, sample_prompts):
+    def test_get_popular_tags_inactive_only(self, tag_repo, mock_chain, sample_tags, sample_prompts):
         """Test getting popular tags for inactive prompts only."""
         # Mock query results for inactive prompts
         mock_results = [
@@ -142,20 +137,7 @@ class TestTagRepositoryContextualFiltering:
         ]
         
         # Mock the query chain with JOIN
-        mock_query = Mock()
-        mock_join = Mock()
-        mock_filter = Mock()
-        mock_group_by = Mock()
-        mock_order_by = Mock()
-        mock_limit = Mock()
-        
-        mock_session.query.return_value = mock_query
-        mock_query.join.return_value = mock_join
-        mock_join.filter.return_value = mock_filter
-        mock_filter.group_by.return_value = mock_group_by
-        mock_group_by.order_by.return_value = mock_order_by
-        mock_order_by.limit.return_value = mock_limit
-        mock_limit.all.return_value = mock_results
+        mock_query = mock_chain(mock_results, joined=True)
         
         # Execute method
         result = tag_repo.get_popular_tags(limit=2, is_active=False)
@@ -170,21 +152,10 @@ class TestTagRepositoryContextualFiltering:
         # Verify JOIN was used for inactive filter
         mock_query.join.assert_called_once()
     
-    def test_get_popular_tags_empty_result(self, tag_repo, mock_session):
+    def test_get_popular_tags_empty_result(self, tag_repo, mock_chain):
         """Test getting popular tags when no tags exist."""
         # Mock empty results
-        mock_query = Mock()
-        mock_outerjoin = Mock()
-        mock_group_by = Mock()
-        mock_order_by = Mock()
-        mock_limit = Mock()
-        
-        mock_session.query.return_value = mock_query
-        mock_query.outerjoin.return_value = mock_outerjoin
-        mock_outerjoin.group_by.return_value = mock_group_by
-        mock_group_by.order_by.return_value = mock_order_by
-        mock_order_by.limit.return_value = mock_limit
-        mock_limit.all.return_value = []
+        mock_chain([])
         
         # Execute method
         result = tag_repo.get_popular_tags(limit=10, is_active=None)
@@ -192,24 +163,13 @@ class TestTagRepositoryContextualFiltering:
         # Verify empty result
         assert len(result) == 0
     
-    def test_get_popular_tags_backward_compatibility(self, tag_repo, mock_session, sample_tags):
+    def test_get_popular_tags_backward_compatibility(self, tag_repo, mock_chain, sample_tags):
         """Test backward compatibility - no is_active parameter."""
         # Mock query results
         mock_results = [(sample_tags[0], 5)]
         
         # Mock the query chain
-        mock_query = Mock()
-        mock_outerjoin = Mock()
-        mock_group_by = Mock()
-        mock_order_by = Mock()
-        mock_limit = Mock()
-        
-        mock_session.query.return_value = mock_query
-        mock_query.outerjoin.return_value = mock_outerjoin
-        mock_outerjoin.group_by.return_value = mock_group_by
-        mock_group_by.order_by.return_value = mock_order_by
-        mock_order_by.limit.return_value = mock_limit
-        mock_limit.all.return_value = mock_results
+        mock_query = mock_chain(mock_results)
         
         # Execute method without is_active parameter
         result = tag_repo.get_popular_tags(limit=1)
@@ -228,8 +188,8 @@ class TestTagServiceContextualFiltering:
     
     @pytest.fixture
     def mock_tag_repo(self):
-        """Create a mock TagRepository."""
-        return Mock(spec=TagRepository)
+        """Create a mock TagRepository with the one method the service calls."""
+        return Mock(spec=['get_popular_tags'])
     
     @pytest.fixture
     def tag_service(self, mock_tag_repo):
@@ -3,6 +3,7 @@ Unit tests for model classes.
 """
 import pytest
 from datetime import datetime
+from sqlalchemy import insert
 from app.models import Prompt, Tag, prompt_tags
 
 
@@ -209,10 +210,13 @@ class TestPromptModel:
     
     def test_get_active(self, db_session):
         """Test getting only active prompts."""
-        # Create mix of active and inactive prompts
-        active1 = Prompt(title="Active 1", content="C1", is_active=True).save()
-        active2 = Prompt(title="Active 2", content="C2", is_active=True).save()
-        inactive = Prompt(title="Inactive", content="C3", is_active=False).save()
+        # Create mix of active and inactive prompts in one commit
+        db_session.add_all([
+            Prompt(title="Active 1", content="C1", is_active=True),
+            Prompt(title="Active 2", content="C2", is_active=True),
+            Prompt(title="Inactive", content="C3", is_active=False)
+        ])
+        db_session.commit()
         
         active_prompts = Prompt.get_active()
         assert len(active_prompts) == 2
@@ -220,24 +224,28 @@ class TestPromptModel:
     
     def test_search(self, db_session):
         """Test search functionality."""
-        # Create prompts with searchable content
-        p1 = Prompt(
-            title="Python Tutorial",
-            content="Learn Python programming",
-            description="Basic Python guide"
-        ).save()
-        
-        p2 = Prompt(
-            title="JavaScript Guide",
-            content="JavaScript for beginners",
-            description="Learn JS basics"
-        ).save()
-        
-        p3 = Prompt(
-            title="API Development",
-            content="Build REST APIs with Python Flask",
-            description=None
-        ).save()
+        # Create prompts with searchable content in one INSERT
+        p1, p2, p3 = db_session.scalars(
+            insert(Prompt).returning(Prompt, sort_by_parameter_order=True),
+            [
+                {
+                    'title': "Python Tutorial",
+                    'content': "Learn Python programming",
+                    'description': "Basic Python guide"
+                },
+                {
+                    'title': "JavaScript Guide",
+                    'content': "JavaScript for beginners",
+                    'description': "Learn JS basics"
+                },
+                {
+                    'title': "API Development",
+                    'content': "Build REST APIs with Python Flask",
+                    'description': None
+                }
+            ]
+        ).all()
+        db_session.commit()
         
         # Search by title
         results = Prompt.search("Python")
@@ -3,8 +3,9 @@ Unit tests for repository classes.
 """
 import pytest
 from datetime import datetime, timedelta
+from sqlalchemy import event
 from app.repositories import PromptRepository, TagRepository
-from app.models import Prompt, Tag
+from app.models import db, Prompt, Tag
 
 
 class TestBaseRepository:
@@ -104,6 +105,20 @@ class TestBaseRepository:
         for prompt in created:
             assert Prompt.query.get(prompt.id) is not None
     
+    def test_create_many_without_commit(self, db_session):
+        """Test create_many only flushes when commit is False."""
+        repo = PromptRepository()
+        
+        created = repo.create_many(
+            [{"title": f"Pending {i}", "content": f"Content {i}"} for i in range(3)],
+            commit=False
+        )
+        assert all(prompt.id is not None for prompt in created)
+        
+        # Nothing was committed, so a rollback discards the batch
+        repo.rollback()
+        assert repo.count(title="Pending 0") == 0
+    
     def test_exists(self, db_session, sample_prompt):
         """Test exists method."""
         repo = PromptRepository()
@@ -148,6 +163,31 @@ class TestPromptRepository:
         assert len(active_prompts) == 2
         assert all(p.is_active for p in active_prompts)
     
+    def test_get_by_id_loads_tags(self, db_session, sample_prompt, sample_tags):
+        """Test that get_by_id loads the tags with the prompt."""
+        repo = PromptRepository()
+        expected_names = {tag.name for tag in sample_tags}
+        sample_prompt.tags.extend(sample_tags)
+        db_session.commit()
+        prompt_id = sample_prompt.id
+        db_session.expunge_all()
+        
+        statements = []
+        
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            prompt = repo.get_by_id(prompt_id)
+            tag_names = {tag.name for tag in prompt.tags}
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+        
+        assert tag_names == expected_names
+        # One query for the prompt and one for all of its tags
+        assert len(statements) == 2
+    
     def test_get_by_ids(self, db_session, sample_prompts):
         """Test getting prompts by multiple IDs."""
         repo = PromptRepository()
@@ -357,6 +397,30 @@ class TestTagRepository:
         assert popular[2]['tag'].name == "unused"
         assert popular[2]['usage_count'] == 0
     
+    def test_get_popular_tags_by_status(self, db_session):
+        """Test getting popular tags for every status at once."""
+        repo = TagRepository()
+        prompt_repo = PromptRepository()
+        
+        shared = repo.create(name="shared", color="#111111")
+        archived = repo.create(name="archived", color="#222222")
+        repo.create(name="unused", color="#333333")
+        
+        for i in range(4):
+            p = prompt_repo.create(title=f"P{i}", content="Content", is_active=i > 1)
+            p.tags.append(shared)
+            if i == 0:
+                p.tags.append(archived)
+        db_session.commit()
+        
+        by_status = repo.get_popular_tags_by_status(limit=3)
+        
+        # Each bucket matches the filtered query
+        for status, is_active in (('all', None), ('active', True), ('inactive', False)):
+            expected = repo.get_popular_tags(limit=3, is_active=is_active)
+            assert [(d['tag'].name, d['usage_count']) for d in by_status[status]] == \
+                [(d['tag'].name, d['usage_count']) for d in expected]
+    
     def test_get_unused_tags(self, db_session, sample_tags):
         """Test getting unused tags."""
         repo = TagRepository()
@@ -4,7 +4,8 @@ Unit tests for service classes.
 import pytest
 from unittest.mock import Mock, MagicMock, patch
 from app.services import PromptService, TagService, MergeService
-from app.models import Prompt, Tag
+from sqlalchemy import event
+from app.models import db, Prompt, Tag
 
 
 class TestPromptService:
@@ -51,6 +52,31 @@ class TestPromptService:
             })
         assert "Title must be less than 255 characters" in str(exc.value)
     
+    def test_create_prompts_batches_tag_writes(self, db_session):
+        """Test that create_prompts writes all tag associations in one statement."""
+        service = PromptService()
+        items = [
+            {'title': f'Bulk {i}', 'content': 'Content', 'tags': ['python', 'api', 'Python']}
+            for i in range(5)
+        ]
+        
+        statements = []
+        
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record_statement)
+        try:
+            prompts = service.create_prompts(items)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record_statement)
+        
+        assert [prompt.title for prompt in prompts] == [f'Bulk {i}' for i in range(5)]
+        assert all(sorted(tag.name for tag in prompt.tags) == ['api', 'python'] for prompt in prompts)
+        # No per-prompt tag lookups, and one executemany for the associations
+        assert sum(statement.startswith('SELECT') for statement in statements) == 1
+        assert sum('INTO prompt_tags' in statement for statement in statements) == 1
+    
     def test_update_prompt_success(self, db_session, sample_prompt):
         """Test successful prompt update."""
         service = PromptService()
@@ -1,26 +1,40 @@
 import pytest
+
+# Every test here drives a browser; skip the module when selenium is missing
+pytest.importorskip("selenium")
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
 import time
 
 
+def _start_chrome():
+    """Start headless Chrome, skipping the tests when no browser can be started"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    
+    # Only a failed start is a skip; errors inside the tests still fail them
+    try:
+        return webdriver.Chrome(options=chrome_options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome WebDriver unavailable: {e.msg}")
+
+
 class TestPromptCardVisibility:
     """Test class for verifying prompt card title visibility in both themes"""
     
     @pytest.fixture(scope="class")
     def driver(self):
         """Setup Chrome driver with headless mode"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = _start_chrome()
         yield driver
         driver.quit()
     
@@ -190,14 +204,7 @@ class TestOtherVisibilityIssues:
     @pytest.fixture(scope="class")
     def driver(self):
         """Setup Chrome driver with headless mode"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = _start_chrome()
         yield driver
         driver.quit()
     